@@ -0,0 +1,423 @@
+"""
+Offline benchmarks for the update.py hot paths.
+
+Every case runs on synthetic inputs (and, with --fixtures, on responses
+recorded by `update.py --record DIR`), so no network is needed. Each case
+reports its best wall time, throughput and peak traced memory. Results are
+compared against benchmarks/baseline.json, and any case that is slower than
+the baseline by more than --threshold counts as a regression.
+
+Usage:
+    python benchmarks/bench.py                      # run and compare
+    python benchmarks/bench.py --only score         # cases matching "score"
+    python benchmarks/bench.py --fixtures fixtures  # add the recorded run
+    python benchmarks/bench.py --save-baseline      # refresh the baseline
+"""
+
+import argparse
+import contextlib
+import email.utils
+import gc
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+sys.path.insert(0, REPO_ROOT)
+
+import update  # noqa: E402
+
+NOW = datetime.now(timezone.utc)
+WORDS = (
+    "space force launch satellite nasa orbit rocket lunar artemis starship "
+    "contract award mission telescope crew station payload defense budget "
+    "weather solar mars booster constellation ground segment sensor test"
+).split()
+
+
+# ---------- synthetic inputs ----------
+
+def synthetic_title(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 12))).capitalize()
+
+
+def synthetic_feed(rng, feed_number, items=20):
+    """A well-formed RSS 2.0 body with items spread over the last four days."""
+    entries = []
+    for item_number in range(items):
+        published = NOW - timedelta(minutes=rng.randint(0, 4 * 24 * 60))
+        entries.append(
+            "<item>"
+            f"<title>{synthetic_title(rng)}</title>"
+            f"<link>https://example.com/{feed_number}/{item_number}</link>"
+            f"<description>{synthetic_title(rng)}</description>"
+            f"<pubDate>{email.utils.format_datetime(published)}</pubDate>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<rss version="2.0"><channel><title>Feed {feed_number}</title>'
+        + "".join(entries)
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+
+def synthetic_sam_record(rng, number):
+    terms = update.SAM_INCLUDE_TERMS + update.SAM_EXCLUDE_TERMS + WORDS * 4
+    return {
+        "noticeId": f"notice-{number}",
+        "title": " ".join(rng.choice(terms) for _ in range(rng.randint(4, 14))),
+        "fullParentPathName": rng.choice([
+            "DEPT OF DEFENSE.DEPT OF THE AIR FORCE.SPACE SYSTEMS COMMAND",
+            "NATIONAL AERONAUTICS AND SPACE ADMINISTRATION.GODDARD SPACE FLIGHT CENTER",
+            "DEPT OF DEFENSE.DEPT OF THE ARMY.AMC.ACC",
+            "GENERAL SERVICES ADMINISTRATION.PUBLIC BUILDINGS SERVICE",
+        ]),
+        "description": f"https://api.sam.gov/prod/opportunities/v1/noticedesc?noticeid={number}",
+        "solicitationNumber": f"FA8820-26-R-{number:04d}",
+        "naicsCode": rng.choice(["541330", "336414", "561720"]),
+        "postedDate": (NOW - timedelta(days=rng.randint(0, 45))).date().isoformat(),
+    }
+
+
+def synthetic_item(rng, source, number):
+    timestamp = NOW - timedelta(minutes=rng.randint(0, 48 * 60))
+    title = synthetic_title(rng)
+    return {
+        "source": source,
+        "title": title,
+        "link": f"https://example.com/{number}",
+        "timestamp": timestamp,
+        "image": update.pick_image_for(title, source),
+    }
+
+
+def synthetic_render_inputs(rng):
+    sources = {
+        source: sorted(
+            (synthetic_item(rng, source, index * 100 + n) for n in range(update.HEADLINES_PER_SOURCE)),
+            key=lambda item: item["timestamp"],
+            reverse=True,
+        )
+        for index, source in enumerate(update.feeds)
+    }
+    top_story = synthetic_item(rng, "SpaceNews", 999999)
+    launches = [
+        {"name": f"Falcon 9 | Starlink Group {n}", "when": "Oct 20, 2026 12:00 UTC",
+         "provider": "SpaceX", "pad": "SLC-40", "loc": "Cape Canaveral, FL, USA"}
+        for n in range(8)
+    ]
+    sam = [
+        update.normalize_sam_opportunity(synthetic_sam_record(rng, n), 40 - n)
+        for n in range(8)
+    ]
+    summary = update.build_summary_html(" ".join(synthetic_title(rng) for _ in range(30)), NOW.strftime("%Y-%m-%d"))
+    return summary, top_story, sources, launches, sam
+
+
+# ---------- cases ----------
+# Each case builder returns (function, units, unit_name); inputs are built
+# outside the timed region.
+
+def case_parse_feeds(feed_count):
+    def build():
+        rng = random.Random(feed_count)
+        bodies = [synthetic_feed(rng, n) for n in range(feed_count)]
+        cutoff = NOW - timedelta(hours=update.ARTICLE_WINDOW_HOURS)
+
+        def run():
+            for body in bodies:
+                update.parse_feed_entries(body, cutoff)
+        return run, feed_count, "feeds"
+    return build
+
+
+def case_score_sam(record_count):
+    def build():
+        rng = random.Random(record_count)
+        records = [synthetic_sam_record(rng, n) for n in range(record_count)]
+
+        def run():
+            for record in records:
+                update.match_sam_terms(record)
+        return run, record_count, "records"
+    return build
+
+
+def case_pick_image(title_count):
+    def build():
+        rng = random.Random(title_count)
+        sources = list(update.feeds)
+        pairs = [(synthetic_title(rng), rng.choice(sources)) for _ in range(title_count)]
+
+        def run():
+            for title, source in pairs:
+                update.pick_image_for(title, source)
+        return run, title_count, "titles"
+    return build
+
+
+def case_rank(article_count):
+    def build():
+        rng = random.Random(article_count)
+        workdir = tempfile.mkdtemp(prefix="bench-rank-")
+        store = update.open_article_store(os.path.join(workdir, update.ARTICLE_DB_FILE))
+        sources = list(update.feeds)
+        store.executemany(
+            "INSERT INTO articles (link, source, title, published, first_seen) VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    f"https://example.com/{n}",
+                    rng.choice(sources),
+                    synthetic_title(rng),
+                    int((NOW - timedelta(minutes=rng.randint(0, 4 * 24 * 60))).timestamp()),
+                    0,
+                )
+                for n in range(article_count)
+            ),
+        )
+        store.commit()
+        cutoff = NOW - timedelta(hours=update.ARTICLE_WINDOW_HOURS)
+
+        def run():
+            update.rank_stage(store, cutoff)
+        return run, article_count, "articles"
+    return build
+
+
+def case_search_index(article_count):
+    def build():
+        rng = random.Random(article_count)
+        workdir = tempfile.mkdtemp(prefix="bench-search-")
+        store = update.open_article_store(os.path.join(workdir, update.ARTICLE_DB_FILE))
+        sources = list(update.feeds)
+        window_minutes = update.SEARCH_WINDOW_DAYS * 24 * 60
+        store.executemany(
+            "INSERT INTO articles (link, source, title, published, first_seen) VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    f"https://example.com/{n}",
+                    rng.choice(sources),
+                    synthetic_title(rng),
+                    int((NOW - timedelta(minutes=rng.randint(0, window_minutes))).timestamp()),
+                    0,
+                )
+                for n in range(article_count)
+            ),
+        )
+        store.commit()
+        since = (NOW - timedelta(days=update.SEARCH_WINDOW_DAYS)).timestamp()
+
+        def run():
+            update.build_search_index(store, since)
+        return run, article_count, "articles"
+    return build
+
+
+def case_render():
+    def build():
+        inputs = synthetic_render_inputs(random.Random(7))
+
+        def run():
+            update.render_stage(*inputs)
+        return run, 1, "pages"
+    return build
+
+
+def case_render_cached():
+    def build():
+        inputs = synthetic_render_inputs(random.Random(7))
+        fragments = {}
+        update.render_stage(*inputs, fragments)
+
+        def run():
+            update.render_stage(*inputs, fragments)
+        return run, 1, "pages"
+    return build
+
+
+def case_inject():
+    def build():
+        content = update.render_stage(*synthetic_render_inputs(random.Random(7)))
+        workdir = tempfile.mkdtemp(prefix="bench-inject-")
+        source_index = os.path.join(REPO_ROOT, update.INDEX_FILE)
+        target_index = os.path.join(workdir, update.INDEX_FILE)
+
+        def run():
+            shutil.copyfile(source_index, target_index)
+            with contextlib.redirect_stdout(io.StringIO()):
+                update.write_stage(content, path=target_index)
+        return run, 1, "pages"
+    return build
+
+
+def case_replay(fixtures):
+    def build():
+        fixtures_dir = os.path.abspath(fixtures)
+
+        def run():
+            # Each replay starts from empty caches in FIXTURES/output, with a
+            # copy of the index.html in the working directory.
+            previous = os.getcwd()
+            os.chdir(REPO_ROOT)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    update.main(["--replay", fixtures_dir])
+            finally:
+                os.chdir(previous)
+                update.configure_fixtures(None)
+        return run, 1, "runs"
+    return build
+
+
+def case_parse_recorded(fixtures):
+    def build():
+        bodies = []
+        for name in sorted(os.listdir(fixtures)):
+            if not name.startswith("feed-"):
+                continue
+            with open(os.path.join(fixtures, name), "r", encoding="utf-8") as file:
+                result = update._fixture_decode(json.load(file)["result"])
+            if result.get("body"):
+                bodies.append(result["body"])
+        cutoff = NOW - timedelta(hours=update.ARTICLE_WINDOW_HOURS)
+
+        def run():
+            for body in bodies:
+                update.parse_feed_entries(body, cutoff)
+        return run, max(1, len(bodies)), "feeds"
+    return build
+
+
+def all_cases(fixtures=None):
+    cases = {
+        "parse_feeds_17": case_parse_feeds(17),
+        "parse_feeds_200": case_parse_feeds(200),
+        "parse_feeds_2000": case_parse_feeds(2000),
+        "score_sam_10k": case_score_sam(10_000),
+        "pick_image_100k": case_pick_image(100_000),
+        "rank_window_20k": case_rank(20_000),
+        "search_index_10k": case_search_index(10_000),
+        "render_headlines": case_render(),
+        "render_headlines_cached": case_render_cached(),
+        "inject_index_html": case_inject(),
+    }
+    if fixtures:
+        cases["parse_recorded_feeds"] = case_parse_recorded(fixtures)
+        cases["replay_full_run"] = case_replay(fixtures)
+    return cases
+
+
+# Cases too slow to repeat many times are capped at this many timed runs.
+REPEAT_CAPS = {"parse_feeds_200": 2, "parse_feeds_2000": 1}
+
+
+# ---------- runner ----------
+
+def measure(build, repeat):
+    """Best wall time over repeat runs, plus peak traced memory of one run."""
+    run, units, unit_name = build()
+    run()  # warm-up: lazy imports, regex caches, first file open
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "seconds": round(best, 6),
+        "throughput": round(units / best, 2) if best else None,
+        "unit": unit_name,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print a comparison table; return the names of regressed cases."""
+    regressions = []
+    print(f"{'case':<22}{'best':>11}{'throughput':>22}{'peak':>12}{'vs base':>10}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        change = ""
+        if base and base.get("seconds"):
+            ratio = result["seconds"] / base["seconds"]
+            change = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio > 1 + threshold:
+                regressions.append(name)
+                change += " ❗"
+        print(
+            f"{name:<22}{result['seconds'] * 1000:>9.2f}ms"
+            f"{result['throughput']:>15,.1f} {result['unit']:<6}"
+            f"{result['peak_kib']:>9,.0f}KiB{change:>10}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for update.py.")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fixtures", help="directory recorded with update.py --record")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="allowed slowdown vs baseline before failing (0.5 = 50%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args(argv)
+
+    cases = all_cases(args.fixtures)
+    if args.only:
+        cases = {name: build for name, build in cases.items() if args.only in name}
+
+    # Benchmarks must never touch the network or the real caches.
+    update.configure_fixtures(None)
+    results = {}
+    for name, build in cases.items():
+        results[name] = measure(build, min(args.repeat, REPEAT_CAPS.get(name, args.repeat)))
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+
+    try:
+        with open(BASELINE_FILE, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        baseline = {}
+
+    regressions = compare(results, baseline.get("cases", {}), args.threshold)
+
+    if args.save_baseline:
+        merged = {**baseline.get("cases", {}), **results}
+        with open(BASELINE_FILE, "w", encoding="utf-8") as file:
+            json.dump(
+                {"python": sys.version.split()[0], "cases": merged},
+                file, indent=2, sort_keys=True,
+            )
+            file.write("\n")
+        print(f"ℹ️ Baseline saved to {os.path.relpath(BASELINE_FILE, REPO_ROOT)}.")
+        return 0
+
+    if regressions:
+        print(f"❗ Slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
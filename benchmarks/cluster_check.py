@@ -0,0 +1,96 @@
+"""
+Near-duplicate clustering check for update.py.
+
+Stores pairs of headlines from two outlets in a scratch article store and
+fails when a pair that is the same story lands in different clusters, or
+when two different stories are folded into one. Also fails when the
+headline selector drops a clustered story from every column.
+
+Usage:
+    python benchmarks/cluster_check.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import update  # noqa: E402
+
+# (first title, second title, same story?)
+PAIRS = [
+    ("SpaceX launches 29 Starlink satellites",
+     "SpaceX launches 29 more Starlink satellites from Florida", True),
+    ("NASA selects SpaceX for Artemis lunar lander",
+     "NASA selects SpaceX for Artemis lunar lander mission", True),
+    ("Rocket Lab Electron launches NASA weather satellites",
+     "Rocket Lab Electron launches NASA weather satellites from New Zealand", True),
+    ("NASA selects SpaceX for Artemis lunar lander",
+     "NASA selects Blue Origin for Artemis lunar lander", False),
+    ("Space Force awards contract for GPS satellites",
+     "Space Force awards contract for missile warning satellites", False),
+    ("SpaceX launches Starlink Group 10-3 mission",
+     "SpaceX launches Starlink Group 10-4 mission", False),
+]
+
+
+def check_selector():
+    """
+    Outlet A has three newer stories and an older copy of story X that its
+    full column cannot take; outlet B's copy of X must still get shown.
+    Returns True when X is on the page.
+    """
+    published = int(datetime.now(timezone.utc).timestamp())
+    story = "https://outlet-a.example/x"
+    rows = []
+    for number in (1, 2, 3):
+        link = f"https://outlet-a.example/{number}"
+        rows.append((link, "Outlet A", f"Story {number}", published - number, link))
+    rows.append((story, "Outlet A", "Story X", published - 10, story))
+    rows.append(("https://outlet-b.example/x", "Outlet B", "Story X", published - 20, story))
+
+    selector = update.HeadlineSelector(per_source=2, overall=80)
+    selector.extend(rows)
+    _, top_story, sources = selector.result()
+    shown = [top_story] + [item for items in sources.values() for item in items]
+    found = any(item["title"] == "Story X" for item in shown)
+    print(f"{'✅' if found else '❗'} {'shown' if found else 'lost'} Story X behind a full column")
+    return found
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="cluster-check-")
+    store = update.open_article_store(os.path.join(workdir, update.ARTICLE_DB_FILE))
+    published = datetime.now(timezone.utc)
+
+    failures = []
+    for number, (first, second, same_story) in enumerate(PAIRS):
+        links = [f"https://outlet-a.example/{number}", f"https://outlet-b.example/{number}"]
+        for source, title, link in zip(("Outlet A", "Outlet B"), (first, second), links):
+            # Pairs are spaced well outside the cluster window so they cannot match each other.
+            timestamp = published - timedelta(hours=number * update.CLUSTER_WINDOW_HOURS * 3)
+            update.store_articles(store, source, [{"title": title, "link": link, "timestamp": timestamp}])
+
+        clusters = [
+            store.execute("SELECT cluster FROM articles WHERE link = ?", (link,)).fetchone()[0]
+            for link in links
+        ]
+        clustered = clusters[0] == clusters[1]
+        mark = "✅" if clustered == same_story else "❗"
+        print(f"{mark} {'same' if clustered else 'apart':<5} {first!r} / {second!r}")
+        if clustered != same_story:
+            failures.append(first)
+
+    store.close()
+    if not check_selector():
+        failures.append("Story X")
+    if failures:
+        print(f"❗ {len(failures)} of {len(PAIRS) + 1} checks failed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Import-time check for update.py.
+
+Imports update.py in a fresh interpreter under `python -X importtime` and
+fails when the cumulative import time goes over budget, or when a module that
+must stay lazy (feedparser, google.genai, jinja2) is loaded at startup.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 200] [--runs 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules update.py only needs on some runs; they must not load on import.
+LAZY_MODULES = ["feedparser", "google.genai", "jinja2"]
+
+
+def measure_import(module="update"):
+    """
+    Import module once in a fresh interpreter. Returns (total_us, loaded),
+    where loaded maps every imported module name to its cumulative time.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    loaded = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        if parts[2] == "site":
+            # Everything up to here is interpreter startup, not update.py.
+            loaded = {}
+            continue
+        loaded[parts[2]] = int(parts[1])
+
+    return loaded.get(module, 0), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=200.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # The fastest of several runs is the least noisy estimate.
+    samples = [measure_import() for _ in range(max(1, args.runs))]
+    total_us, loaded = min(samples, key=lambda sample: sample[0])
+    total_ms = total_us / 1000
+
+    print(f"import update: {total_ms:.1f} ms (best of {len(samples)})")
+    slowest = sorted(loaded.items(), key=lambda item: item[1], reverse=True)[1:6]
+    for name, cumulative_us in slowest:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    for name in LAZY_MODULES:
+        if name in loaded:
+            failures.append(f"{name} is imported at startup; import it lazily.")
+    if total_ms > args.budget_ms:
+        failures.append(
+            f"import took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget."
+        )
+
+    for failure in failures:
+        print(f"❗ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
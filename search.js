@@ -0,0 +1,132 @@
+// Answers ?q= searches in the browser from the prebuilt index in /search/
+// (written by update.py). Only meta.json, the term shards for the query's
+// words and the docs shards of the best matches are downloaded.
+(function () {
+  const SEARCH_BASE = "/search/";
+  const MAX_RESULTS = 30;
+
+  const query = (new URLSearchParams(window.location.search).get("q") || "").trim();
+  const input = document.getElementById("search-input");
+  if (input) input.value = query;
+
+  const results = document.getElementById("search-results");
+  if (!query || !results) return;
+
+  const loaded = {};
+
+  function load(name, meta) {
+    if (!loaded[name]) {
+      const version = meta ? "?v=" + meta.files[name] : "";
+      loaded[name] = fetch(SEARCH_BASE + name + version).then(function (response) {
+        if (!response.ok) throw new Error(name + ": HTTP " + response.status);
+        return response.json();
+      });
+    }
+    return loaded[name];
+  }
+
+  // Must match title_tokens() in update.py.
+  function queryTokens(text, stopwords) {
+    const tokens = [];
+    (text.toLowerCase().match(/[a-z0-9]+/g) || []).forEach(function (word) {
+      if (stopwords.has(word)) return;
+      if (word.length > 3 && word.endsWith("s") && !word.endsWith("ss")) {
+        word = word.slice(0, -1);
+      }
+      if (tokens.indexOf(word) < 0) tokens.push(word);
+    });
+    return tokens;
+  }
+
+  function decode(deltas) {
+    const rowids = new Set();
+    let rowid = 0;
+    deltas.forEach(function (delta) {
+      rowid += delta;
+      rowids.add(rowid);
+    });
+    return rowids;
+  }
+
+  // Rowids matching one token; the last token also matches as a prefix,
+  // so "starl" finds "Starlink".
+  function postings(token, shard, prefix) {
+    const rowids = new Set();
+    Object.keys(shard).forEach(function (term) {
+      if (term === token || (prefix && term.startsWith(token))) {
+        decode(shard[term]).forEach(function (rowid) { rowids.add(rowid); });
+      }
+    });
+    return rowids;
+  }
+
+  function show(message, matches) {
+    results.hidden = false;
+    results.textContent = "";
+
+    const heading = document.createElement("h2");
+    heading.textContent = message;
+    results.appendChild(heading);
+    if (!matches || !matches.length) return;
+
+    const list = document.createElement("ol");
+    matches.forEach(function (doc) {
+      if (!/^https?:\/\//i.test(doc[2])) return;
+      const item = document.createElement("li");
+      const link = document.createElement("a");
+      link.href = doc[2];
+      link.target = "_blank";
+      link.rel = "noopener noreferrer";
+      link.textContent = doc[1];
+      const meta = document.createElement("span");
+      meta.className = "search-meta";
+      meta.textContent = " — " + doc[3] + ", " + new Date(doc[4] * 1000).toLocaleDateString();
+      item.appendChild(link);
+      item.appendChild(meta);
+      list.appendChild(item);
+    });
+    results.appendChild(list);
+  }
+
+  load("meta.json").then(function (meta) {
+    const tokens = queryTokens(query, new Set(meta.stopwords));
+    const shardNames = tokens.map(function (token) { return "terms-" + token[0] + ".json"; });
+    if (!tokens.length || shardNames.some(function (name) { return !meta.files[name]; })) {
+      return { docs: [], total: 0 };
+    }
+
+    return Promise.all(shardNames.map(function (name) { return load(name, meta); })).then(function (shards) {
+      let matched = null;
+      tokens.forEach(function (token, position) {
+        const rowids = postings(token, shards[position], position === tokens.length - 1);
+        matched = matched === null
+          ? rowids
+          : new Set(Array.from(matched).filter(function (rowid) { return rowids.has(rowid); }));
+      });
+
+      // Higher rowids were stored later, so they are the newer articles.
+      const best = Array.from(matched).sort(function (a, b) { return b - a; }).slice(0, MAX_RESULTS);
+      const docShards = Array.from(new Set(best.map(function (rowid) {
+        return "docs-" + Math.floor(rowid / meta.doc_shard_size) + ".json";
+      })));
+
+      return Promise.all(docShards.map(function (name) { return load(name, meta); })).then(function (shards) {
+        const wanted = new Set(best);
+        const docs = [];
+        shards.forEach(function (records) {
+          records.forEach(function (doc) {
+            if (wanted.has(doc[0])) docs.push(doc);
+          });
+        });
+        docs.sort(function (a, b) { return b[4] - a[4]; });
+        return { docs: docs, total: matched.size };
+      });
+    });
+  }).then(function (found) {
+    const noun = found.total === 1 ? " result" : " results";
+    const shown = found.total > found.docs.length ? " (newest " + found.docs.length + " shown)" : "";
+    show(found.total + noun + " for “" + query + "”" + shown, found.docs);
+  }).catch(function () {
+    show("Search is unavailable right now.");
+  });
+})();
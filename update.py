@@ -1,16 +1,34 @@
-import feedparser
+import argparse
+import contextlib
 import re
+from collections import deque, namedtuple
 from datetime import datetime, timezone, timedelta
-from time import mktime
+from time import gmtime, mktime, monotonic, perf_counter, sleep
 from random import randint
 import os
+import sqlite3
+import threading
 import html as html_lib
-from google import genai
+import base64
+import functools
+import hashlib
+import http.client
+import io
+import heapq
+import shutil
+import ssl
+import zlib
+
+# Heavy third-party modules (feedparser, google.genai) are imported inside the
+# functions that need them. Most runs reuse today's cached summary and never
+# touch Gemini, so paying for those imports at startup is wasted time.
 
 # NEW: stdlib for API call (no YAML changes needed)
 import json
-from urllib.request import urlopen, Request
-from urllib.parse import urlencode
+from urllib.error import HTTPError
+from urllib.parse import unquote, urlencode, urljoin, urlparse, urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
 
 # FEED SOURCES
 feeds = {
@@ -68,6 +86,611 @@ source_links = {
     "NASA Watch": "https://nasawatch.com/",
 }
 
+# ============================================================
+# RECORD / REPLAY
+# With --record DIR every external call (feeds, Launch Library 2,
+# SAM.gov, Gemini) saves its response under DIR. With --replay DIR
+# the same calls are answered from DIR with no network at all,
+# optionally sleeping for the recorded per-host latency. This gives
+# a reproducible end-to-end run for benchmarks and regressions.
+# Both modes start cold (no feed validators, poll schedules, TTL
+# caches or open circuit breakers), so every call is really made,
+# and a replay writes its state and page under DIR/output only.
+# ============================================================
+
+FIXTURE_DIR = "fixtures"
+REPLAY_OUTPUT_DIR = "output"  # under the fixture directory
+FIXTURES = {
+    "mode": None,       # None, "record" or "replay"
+    "directory": FIXTURE_DIR,
+    "latency": 0.0,     # replay: multiple of the recorded latency to sleep
+}
+
+
+def configure_fixtures(mode=None, directory=FIXTURE_DIR, latency=0.0):
+    """Switch record/replay on or off for every recordable call."""
+    if mode not in (None, "record", "replay"):
+        raise ValueError(f"Unknown fixture mode: {mode}")
+    # Absolute, so a replay can run from its output directory.
+    directory = os.path.abspath(directory)
+    FIXTURES.update({"mode": mode, "directory": directory, "latency": latency})
+    if mode == "record":
+        os.makedirs(directory, exist_ok=True)
+
+
+def fixtures_active():
+    """
+    True while recording or replaying. Callers then skip their caches and
+    validators, so no recordable call is short-circuited.
+    """
+    return FIXTURES["mode"] is not None
+
+
+@contextlib.contextmanager
+def replay_directory():
+    """
+    While replaying, run the block in a fresh DIR/output directory that
+    holds a copy of the current index.html. The replay's caches, article
+    store, circuit breakers and page are written there instead of over the
+    live ones. Does nothing in other modes.
+    """
+    if FIXTURES["mode"] != "replay":
+        yield
+        return
+
+    directory = os.path.join(FIXTURES["directory"], REPLAY_OUTPUT_DIR)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    if os.path.exists(INDEX_FILE):
+        shutil.copyfile(INDEX_FILE, os.path.join(directory, INDEX_FILE))
+
+    previous = os.getcwd()
+    os.chdir(directory)
+    print(f"ℹ️ Replaying into {directory}.")
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _fixture_encode(value):
+    """Make a recorded result JSON-safe (bytes become base64)."""
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, dict):
+        return {key: _fixture_encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_fixture_encode(item) for item in value]
+    return value
+
+
+def _fixture_decode(value):
+    """Reverse _fixture_encode."""
+    if isinstance(value, dict):
+        if set(value) == {"__bytes__"}:
+            return base64.b64decode(value["__bytes__"])
+        return {key: _fixture_decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fixture_decode(item) for item in value]
+    return value
+
+
+def fixture_path(kind, key):
+    """File that holds the recorded response for one call."""
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(FIXTURES["directory"], f"{kind}-{digest}.json")
+
+
+def recordable(kind, key_func, host=None):
+    """
+    Route a fetcher through the record/replay layer. key_func receives the
+    call's arguments and returns a stable key; it must leave out values that
+    change from run to run (API keys, dates, validators).
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            mode = FIXTURES["mode"]
+            if not mode:
+                return function(*args, **kwargs)
+
+            key = key_func(*args, **kwargs)
+            path = fixture_path(kind, key)
+
+            if mode == "replay":
+                try:
+                    with open(path, "r", encoding="utf-8") as file:
+                        fixture = json.load(file)
+                except (FileNotFoundError, json.JSONDecodeError) as error:
+                    raise RuntimeError(f"No recorded {kind} fixture for {key}") from error
+                if FIXTURES["latency"]:
+                    sleep(fixture.get("elapsed", 0) * FIXTURES["latency"])
+                return _fixture_decode(fixture["result"])
+
+            started = perf_counter()
+            result = function(*args, **kwargs)
+            fixture = {
+                "kind": kind,
+                "key": key,
+                "host": host or urlparse(key).netloc,
+                "elapsed": round(perf_counter() - started, 4),
+                "result": _fixture_encode(result),
+            }
+            temporary_file = path + ".tmp"
+            with open(temporary_file, "w", encoding="utf-8") as file:
+                json.dump(fixture, file, indent=1, ensure_ascii=False)
+            os.replace(temporary_file, path)
+            return result
+
+        return wrapper
+    return decorator
+
+# ============================================================
+# END RECORD / REPLAY
+# ============================================================
+
+# ============================================================
+# RUN METRICS
+# Wall time and counters for every stage and external host of a
+# run, appended as one JSON line per run to run_metrics.jsonl.
+# `update.py --metrics-report` prints p50/p95 per stage/source.
+# ============================================================
+
+RUN_METRICS_FILE = "run_metrics.jsonl"
+RUN_METRICS_KEEP = 2000  # most recent runs kept in the file
+
+
+class RunMetrics:
+    """Timings and counters collected during one update run."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.started = perf_counter()
+        self.timings = []
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage, seconds, status="ok", **labels):
+        """Add one timing, e.g. record("feed_fetch", 0.4, source="Payload")."""
+        entry = {"stage": stage, "seconds": round(seconds, 4), "status": status}
+        entry.update({key: value for key, value in labels.items() if value is not None})
+        with self.lock:
+            self.timings.append(entry)
+
+    @contextlib.contextmanager
+    def stage(self, stage, **labels):
+        """Time a block; an exception marks the timing as an error."""
+        started = perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.record(stage, perf_counter() - started, status, **labels)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """The machine-readable report for this run."""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(perf_counter() - self.started, 4),
+            "fixtures": FIXTURES["mode"],
+            "counters": dict(sorted(self.counters.items())),
+            "timings": list(self.timings),
+        }
+
+    def write(self, path=RUN_METRICS_FILE, keep=RUN_METRICS_KEEP):
+        """Append this run's report, keeping only the newest `keep` runs."""
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+        lines = lines[-(keep - 1):] if keep > 1 else []
+        lines.append(json.dumps(self.report(), ensure_ascii=False))
+
+        temporary_file = path + ".tmp"
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temporary_file, path)
+
+
+METRICS = RunMetrics()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def print_metrics_report(path=RUN_METRICS_FILE):
+    """Print p50/p95 wall time per stage and source over the saved runs."""
+    samples = {}
+    runs = []
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    run = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                runs.append(run["seconds"])
+                for timing in run.get("timings", []):
+                    label = timing.get("source") or timing.get("search") or ""
+                    key = (timing["stage"], label)
+                    samples.setdefault(key, []).append(timing["seconds"])
+    except FileNotFoundError:
+        print(f"❗ {path} not found.")
+        return
+
+    if not runs:
+        print(f"❗ No runs recorded in {path}.")
+        return
+
+    print(f"{len(runs)} runs: p50 {_percentile(runs, 0.5):.2f}s, p95 {_percentile(runs, 0.95):.2f}s")
+    print(f"{'stage':<16}{'source':<48}{'n':>6}{'p50':>9}{'p95':>9}")
+    rows = sorted(samples.items(), key=lambda item: _percentile(item[1], 0.95), reverse=True)
+    for (stage, label), values in rows:
+        print(
+            f"{stage:<16}{label[:46]:<48}{len(values):>6}"
+            f"{_percentile(values, 0.5):>8.2f}s{_percentile(values, 0.95):>8.2f}s"
+        )
+
+# ============================================================
+# END RUN METRICS
+# ============================================================
+
+# ============================================================
+# RUN BUDGET & CIRCUIT BREAKERS
+# A run must finish before the next 5-minute slot. Every outbound
+# call is cut off at the run's deadline and stragglers are
+# abandoned; their sources keep serving their last good data.
+# A source that keeps failing is skipped for a cooldown that
+# doubles with each further failure, so one dead host does not
+# cost every run its full timeout. Breaker state persists in
+# circuit_breakers.json between runs.
+# ============================================================
+
+RUN_BUDGET_SECONDS = 210  # leaves room to rank, render and write
+BREAKER_FILE = "circuit_breakers.json"
+BREAKER_THRESHOLD = 2  # consecutive failures before a source is skipped
+BREAKER_BASE_COOLDOWN = 10 * 60
+BREAKER_MAX_COOLDOWN = 6 * 60 * 60
+
+
+class RunBudgetExceeded(TimeoutError):
+    """
+    The run's time budget was spent before a call could start or finish.
+    This is not the source's fault, so it never counts toward its breaker.
+    """
+
+
+class RunBudget:
+    """Deadline shared by every fetcher of one run (or one daemon cycle)."""
+
+    def __init__(self):
+        self.deadline = None
+
+    def start(self, seconds=RUN_BUDGET_SECONDS):
+        self.deadline = monotonic() + seconds
+
+    def remaining(self):
+        """Seconds left, or None when no budget is running."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - monotonic())
+
+    def timeout(self, limit):
+        """limit cut down to what is left of the budget; raises once it is spent."""
+        left = self.remaining()
+        if left is None:
+            return limit
+        if left <= 0:
+            raise RunBudgetExceeded("run time budget spent")
+        return min(limit, left)
+
+
+RUN_BUDGET = RunBudget()
+
+
+class CircuitBreakers:
+    """Consecutive failures per source and when a failing source is due again."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = {}
+        self.changed = False
+
+    def load(self, path=BREAKER_FILE):
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self.state = data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            self.state = {}
+        self.changed = False
+
+    def save(self, path=BREAKER_FILE):
+        if not self.changed:
+            return
+        with self.lock:
+            data = dict(self.state)
+            self.changed = False
+        temporary_file = path + ".tmp"
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(temporary_file, path)
+
+    def allow(self, source, now=None):
+        """False while source is cooling down after repeated failures."""
+        if fixtures_active():
+            return True
+        with self.lock:
+            retry_at = (self.state.get(source) or {}).get("retry_at")
+            failures = (self.state.get(source) or {}).get("failures", 0)
+        if not retry_at:
+            return True
+        now = now or datetime.now(timezone.utc)
+        try:
+            if datetime.fromisoformat(retry_at) <= now:
+                return True
+        except (TypeError, ValueError):
+            return True
+        METRICS.count("breaker_skips")
+        print(f"ℹ️ Skipping {source} after {failures} failures; next try at {retry_at[11:16]} UTC.")
+        return False
+
+    def success(self, source):
+        with self.lock:
+            if self.state.pop(source, None) is not None:
+                self.changed = True
+
+    def failure(self, source, now=None):
+        """Count a failure; from BREAKER_THRESHOLD on, open the breaker."""
+        now = now or datetime.now(timezone.utc)
+        with self.lock:
+            entry = self.state.setdefault(source, {})
+            entry["failures"] = failures = entry.get("failures", 0) + 1
+            if failures >= BREAKER_THRESHOLD:
+                cooldown = min(
+                    BREAKER_MAX_COOLDOWN,
+                    BREAKER_BASE_COOLDOWN * 2 ** (failures - BREAKER_THRESHOLD),
+                )
+                entry["retry_at"] = (now + timedelta(seconds=cooldown)).isoformat()
+            self.changed = True
+
+
+BREAKERS = CircuitBreakers()
+
+# ============================================================
+# END RUN BUDGET & CIRCUIT BREAKERS
+# ============================================================
+
+# ============================================================
+# HTTP CLIENT
+# Every outbound call (feeds, Launch Library 2, SAM.gov) goes
+# through one shared client. Connections are kept alive and pooled
+# per host, so a second request to the same host skips the TCP and
+# TLS handshake; a per-host limit keeps those requests on the same
+# few connections; gzip/deflate (and br, when brotli is installed)
+# responses are decoded here.
+# ============================================================
+
+HTTP_USER_AGENT = "SpaceHeadlinesBot/1.0"
+HTTP_HOST_CONCURRENCY = 2  # simultaneous requests per host, unless listed below
+# Hosts whose callers fan out on purpose get their own limit; sections that
+# own such a host add it here (see SAM.GOV).
+HTTP_HOST_LIMITS = {}
+HTTP_IDLE_PER_HOST = 2     # kept-alive connections parked per host
+HTTP_IDLE_SECONDS = 30     # older idle connections are likely closed server-side
+HTTP_MAX_REDIRECTS = 5
+HTTP_READ_CHUNK = 64 * 1024  # the run deadline is checked between chunks
+HTTP_REDIRECT_CODES = frozenset([301, 302, 303, 307, 308])
+
+HttpResponse = namedtuple("HttpResponse", ["url", "status", "headers", "body"])
+
+
+@functools.lru_cache(maxsize=1)
+def _brotli():
+    """The optional brotli module, or None when it is not installed."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def decode_http_body(body, encoding):
+    """Undo a Content-Encoding of gzip, deflate or br."""
+    encoding = (encoding or "").strip().lower()
+    if not body or encoding in ("", "identity"):
+        return body
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        # Servers send either zlib-wrapped or raw deflate data.
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    if encoding == "br" and _brotli():
+        return _brotli().decompress(body)
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+
+class HttpClient:
+    """Keep-alive connection pool shared by every fetcher, keyed by host."""
+
+    def __init__(self, host_concurrency=HTTP_HOST_CONCURRENCY, idle_per_host=HTTP_IDLE_PER_HOST, host_limits=None):
+        self.host_concurrency = host_concurrency
+        self.host_limits = HTTP_HOST_LIMITS if host_limits is None else host_limits
+        self.idle_per_host = idle_per_host
+        self._lock = threading.Lock()
+        self._idle = {}   # (scheme, host, port) -> [(connection, parked_at)]
+        self._slots = {}  # (scheme, host, port) -> BoundedSemaphore
+        self._ssl_context = None
+
+    def _slot(self, origin):
+        with self._lock:
+            slot = self._slots.get(origin)
+            if slot is None:
+                limit = self.host_limits.get(origin[1], self.host_concurrency)
+                slot = self._slots[origin] = threading.BoundedSemaphore(limit)
+            return slot
+
+    def _checkout(self, origin, timeout, fresh=False):
+        """Reuse a parked connection for origin, or open a new one."""
+        with self._lock:
+            parked = [] if fresh else self._idle.get(origin) or []
+            while parked:
+                connection, parked_at = parked.pop()
+                if monotonic() - parked_at < HTTP_IDLE_SECONDS:
+                    connection.timeout = timeout
+                    if connection.sock is not None:
+                        connection.sock.settimeout(timeout)
+                    return connection, True
+                connection.close()
+            if origin[0] == "https" and self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+
+        scheme, host, port = origin
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        return connection, False
+
+    def _checkin(self, origin, connection):
+        with self._lock:
+            parked = self._idle.setdefault(origin, [])
+            if len(parked) < max(self.idle_per_host, self.host_limits.get(origin[1], 0)):
+                parked.append((connection, monotonic()))
+                return
+        connection.close()
+
+    @staticmethod
+    def _read_body(connection, response):
+        """
+        Read a response body in chunks. The socket timeout applies to each
+        read, so before every chunk it is cut down to what is left of
+        RUN_BUDGET: a host that trickles bytes cannot hold the run, or the
+        worker thread it abandoned at the deadline, past the budget.
+        """
+        chunks = []
+        while True:
+            left = RUN_BUDGET.remaining()
+            if left is not None:
+                if left <= 0:
+                    raise RunBudgetExceeded("run time budget spent reading a response")
+                if connection.sock is not None:
+                    connection.sock.settimeout(min(connection.timeout, left))
+            chunk = response.read1(HTTP_READ_CHUNK)
+            if not chunk:
+                # read1() leaves a fully read response open; read() closes
+                # it, so the connection can be reused.
+                response.read()
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def _send(self, origin, target, headers, timeout):
+        """One request/response on a pooled connection; returns (status, headers, body)."""
+        connection, reused = self._checkout(origin, timeout)
+        while True:
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                body = self._read_body(connection, response)
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if not reused:
+                    raise
+                # The server dropped the idle connection; GET is safe to retry.
+                METRICS.count("http_stale_retries")
+                connection, reused = self._checkout(origin, timeout, fresh=True)
+            except Exception:
+                connection.close()
+                raise
+
+        METRICS.count("http_connections_reused" if reused else "http_connections_opened")
+        if response.will_close:
+            connection.close()
+        else:
+            self._checkin(origin, connection)
+        return response.status, response.headers, body
+
+    def get(self, url, headers=None, timeout=20):
+        """
+        GET url, following redirects. Returns an HttpResponse with the decoded
+        body for 2xx and 304; raises urllib's HTTPError for other statuses so
+        callers can keep checking error.code. The timeout is cut down to what
+        is left of RUN_BUDGET.
+        """
+        request_headers = {
+            "User-Agent": HTTP_USER_AGENT,
+            "Accept-Encoding": "gzip, deflate, br" if _brotli() else "gzip, deflate",
+        }
+        request_headers.update(headers or {})
+
+        for _ in range(HTTP_MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            scheme = parts.scheme.lower()
+            if scheme not in ("http", "https"):
+                raise ValueError(f"Unsupported URL scheme: {url}")
+            origin = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+            target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+
+            slot = self._slot(origin)
+            if not slot.acquire(timeout=RUN_BUDGET.remaining()):
+                raise RunBudgetExceeded(f"run time budget spent waiting for {origin[1]}")
+            try:
+                request_timeout = RUN_BUDGET.timeout(timeout)
+                status, response_headers, body = self._send(origin, target, request_headers, request_timeout)
+            except TimeoutError as error:
+                # A timeout cut down to the deadline is the budget's, not the host's.
+                if RUN_BUDGET.remaining() == 0 and not isinstance(error, RunBudgetExceeded):
+                    raise RunBudgetExceeded(f"run time budget spent waiting for {origin[1]}") from error
+                raise
+            finally:
+                slot.release()
+
+            location = response_headers.get("Location")
+            if status in HTTP_REDIRECT_CODES and location:
+                url = urljoin(url, location)
+                continue
+
+            METRICS.count("http_bytes_transferred", len(body))
+            body = decode_http_body(body, response_headers.get("Content-Encoding"))
+            if status >= 400 or (status >= 300 and status != 304):
+                raise HTTPError(url, status, http.client.responses.get(status, ""), response_headers, io.BytesIO(body))
+            return HttpResponse(url, status, response_headers, body)
+
+        raise HTTPError(url, status, "Too many redirects", response_headers, None)
+
+    def close(self):
+        """Close every parked connection."""
+        with self._lock:
+            parked = [connection for pool in self._idle.values() for connection, _ in pool]
+            self._idle.clear()
+        for connection in parked:
+            connection.close()
+
+
+HTTP = HttpClient()
+
+# ============================================================
+# END HTTP CLIENT
+# ============================================================
+
 # ---------- TEMPLATED IMAGE SELECTION (NO SCRAPING) ----------
 IMAGE_DIR = "images/"
 IMAGE_MAP = {
@@ -112,49 +735,213 @@ def pick_image_for(title: str, source: str) -> str:
     return IMAGE_MAP["default"]
 # -------------------------------------------------------------
 
-# NEW: Upcoming Launches fetcher (Launch Library 2 – The Space Devs)
-def fetch_upcoming_launches(limit=8, days_ahead=7):
-    base = "https://ll.thespacedevs.com/2.2.0/launch/upcoming/"
+
+# ============================================================
+# UPCOMING LAUNCHES (Launch Library 2 – The Space Devs)
+# Launches are cached in launches_cache.json. A fresh cache is
+# reused as is; a stale one is refreshed with a `last_updated`
+# delta query so only changed launches come back, with a full
+# pull every few hours. When the API errors or throttles, the
+# cached launches are served instead of dropping the column.
+# ============================================================
+
+LAUNCHES_API_URL = "https://ll.thespacedevs.com/2.2.0/launch/upcoming/"
+LAUNCHES_CACHE_FILE = "launches_cache.json"
+LAUNCHES_CACHE_MINUTES = 30
+LAUNCHES_FULL_REFRESH_HOURS = 6  # deltas never see deleted launches
+LAUNCHES_FETCH_LIMIT = 25  # spare launches for when the first ones lift off
+LAUNCHES_DELTA_LIMIT = 100
+LAUNCHES_THROTTLE_MINUTES = 15  # backoff when a 429 has no Retry-After
+
+
+class LaunchesThrottled(RuntimeError):
+    """Launch Library 2 answered 429; retry_after is in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"throttled, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def parse_launch_time(value):
+    """Parse a Launch Library ISO timestamp; None when missing or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+@recordable(
+    "launches",
+    lambda updated_since=None, limit=LAUNCHES_FETCH_LIMIT:
+        f"limit={limit}&delta={int(bool(updated_since))}",
+    host="ll.thespacedevs.com",
+)
+def fetch_launch_records(updated_since=None, limit=LAUNCHES_FETCH_LIMIT):
+    """
+    Fetch upcoming launches as cache records. With updated_since (an ISO
+    timestamp), only launches changed since then are returned.
+    """
     params = {
         "limit": limit,
         "hide_recent_previous": "true",
         "ordering": "window_start",
     }
-    url = base + "?" + urlencode(params)
-    req = Request(url, headers={"User-Agent": "SpaceHeadlinesBot/1.0"})
-    with urlopen(req, timeout=20) as resp:
-        data = json.loads(resp.read().decode("utf-8"))
+    if updated_since:
+        params["last_updated__gte"] = updated_since
+    url = LAUNCHES_API_URL + "?" + urlencode(params)
+    try:
+        data = json.loads(HTTP.get(url, timeout=20).body.decode("utf-8"))
+    except HTTPError as error:
+        if error.code != 429:
+            raise
+        retry_after = error.headers.get("Retry-After") if error.headers else None
+        if not str(retry_after or "").isdigit():
+            retry_after = LAUNCHES_THROTTLE_MINUTES * 60
+        raise LaunchesThrottled(int(retry_after)) from error
+
+    records = []
+    for L in data.get("results", []):
+        if not L.get("id") or not parse_launch_time(L.get("window_start")):
+            continue
+        records.append({
+            "id": L["id"],
+            "window_start": L["window_start"],
+            "last_updated": L.get("last_updated") or "",
+            "name": L.get("name") or "TBD",
+            "provider": (L.get("launch_service_provider") or {}).get("name") or "—",
+            "pad": ((L.get("pad") or {}).get("name") or "—"),
+            "loc": ((L.get("pad") or {}).get("location") or {}).get("name") or "",
+        })
+    return records
 
-    now = datetime.now(timezone.utc)
+
+def upcoming_launch_rows(records, limit=8, days_ahead=7, now=None):
+    """
+    Turn cache records into launch rows for the column, soonest first. A
+    window that already opened stays listed (holds, slips, launches in
+    flight) for as long as the API keeps the launch in its upcoming list.
+    """
+    now = now or datetime.now(timezone.utc)
     cutoff = now + timedelta(days=days_ahead)
 
-    launches = []
-    for L in data.get("results", []):
-        start = L.get("window_start")
-        dt = None
-        if start:
-            try:
-                dt = datetime.fromisoformat(start.replace("Z", "+00:00"))
-            except Exception:
-                dt = None
-        if not dt or dt > cutoff:
-            continue
+    dated = []
+    for record in records:
+        dt = parse_launch_time(record.get("window_start"))
+        if dt and dt <= cutoff:
+            dated.append((dt, record))
+    dated.sort(key=lambda pair: pair[0])
+
+    return [
+        {
+            "name": record["name"],
+            "when": dt.strftime("%b %d, %Y %H:%M UTC"),
+            "window_start": dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "provider": record["provider"],
+            "pad": record["pad"],
+            "loc": record["loc"],
+        }
+        for dt, record in dated[:limit]
+    ]
 
-        name = L.get("name") or "TBD"
-        when = dt.strftime("%b %d, %Y %H:%M UTC") if dt else "TBD"
-        provider = (L.get("launch_service_provider") or {}).get("name") or "—"
-        pad = ((L.get("pad") or {}).get("name") or "—")
-        loc = ((L.get("pad") or {}).get("location") or {}).get("name") or ""
-
-        launches.append({
-            "name": name,
-            "when": when,
-            "provider": provider,
-            "pad": pad,
-            "loc": loc
-        })
 
-    return launches[:limit]
+def load_launches_cache():
+    """Load previously saved launch records."""
+    try:
+        with open(LAUNCHES_CACHE_FILE, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            return data
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        pass
+    return {}
+
+
+def save_launches_cache(cache):
+    """Save the launch records and refresh timestamps for later runs."""
+    temporary_file = LAUNCHES_CACHE_FILE + ".tmp"
+    with open(temporary_file, "w", encoding="utf-8") as file:
+        json.dump(cache, file, indent=2, ensure_ascii=False)
+    os.replace(temporary_file, LAUNCHES_CACHE_FILE)
+
+
+def get_upcoming_launches(limit=8, days_ahead=7):
+    """
+    Use cached launches when fresh, otherwise refresh the cache from Launch
+    Library 2. A failed or throttled refresh falls back to the cached launches.
+    """
+    cache = {} if fixtures_active() else load_launches_cache()
+    now = datetime.now(timezone.utc)
+    records = {
+        record["id"]: record
+        for record in cache.get("launches", [])
+        if isinstance(record, dict) and record.get("id")
+    }
+    fetched_at = parse_launch_time(cache.get("fetched_at"))
+    if records and fetched_at and now - fetched_at < timedelta(minutes=LAUNCHES_CACHE_MINUTES):
+        print("ℹ️ Reusing cached upcoming launches.")
+        return upcoming_launch_rows(records.values(), limit, days_ahead, now)
+
+    throttled_until = parse_launch_time(cache.get("throttled_until"))
+    if records and throttled_until and now < throttled_until:
+        print("ℹ️ Launch Library is throttling requests; using cached launches.")
+        return upcoming_launch_rows(records.values(), limit, days_ahead, now)
+
+    if not BREAKERS.allow("launches"):
+        return upcoming_launch_rows(records.values(), limit, days_ahead, now)
+
+    # A delta only returns launches that changed, so fall back to a full pull
+    # when the spare launches run low or the last full pull is too old. Only
+    # a full pull drops launches the API no longer lists as upcoming, so one
+    # is also made once any cached launch window has opened.
+    full_at = parse_launch_time(cache.get("full_at"))
+    full_refresh = (
+        len(records) < limit
+        or not full_at
+        or now - full_at >= timedelta(hours=LAUNCHES_FULL_REFRESH_HOURS)
+        or any(
+            (parse_launch_time(record.get("window_start")) or now) < now
+            for record in records.values()
+        )
+    )
+    try:
+        if full_refresh:
+            fetched = fetch_launch_records(limit=LAUNCHES_FETCH_LIMIT)
+            records = {record["id"]: record for record in fetched}
+            cache["full_at"] = now.isoformat()
+        else:
+            # Server timestamps, so clock skew cannot hide an update.
+            updated_since = max(record["last_updated"] for record in records.values())
+            fetched = fetch_launch_records(updated_since=updated_since, limit=LAUNCHES_DELTA_LIMIT)
+            records.update((record["id"], record) for record in fetched)
+        METRICS.count("launches_full_refreshes" if full_refresh else "launches_delta_refreshes")
+        METRICS.count("launches_fetched", len(fetched))
+        cache["fetched_at"] = now.isoformat()
+        cache.pop("throttled_until", None)
+        BREAKERS.success("launches")
+
+    except LaunchesThrottled as error:
+        print(f"⚠️ Launch Library throttled the launches update: {error}")
+        cache["throttled_until"] = (now + timedelta(seconds=error.retry_after)).isoformat()
+
+    except RunBudgetExceeded as error:
+        print(f"⚠️ Upcoming launches update cancelled at the run deadline: {error}")
+        if records:
+            print("ℹ️ Using the previous upcoming launches cache.")
+
+    except Exception as error:
+        BREAKERS.failure("launches")
+        print(f"⚠️ Upcoming launches update failed: {error}")
+        if records:
+            print("ℹ️ Using the previous upcoming launches cache.")
+
+    cache["launches"] = sorted(records.values(), key=lambda record: record["window_start"])
+    try:
+        save_launches_cache(cache)
+    except OSError as error:
+        print(f"⚠️ Could not save the launches cache: {error}")
+    return upcoming_launch_rows(records.values(), limit, days_ahead, now)
 
 
 # ============================================================
@@ -164,8 +951,20 @@ def fetch_upcoming_launches(limit=8, days_ahead=7):
 # ============================================================
 
 SAM_CACHE_FILE = "sam_opportunities.json"
-SAM_CACHE_HOURS = 24
+SAM_CACHE_HOURS = 1
+SAM_STORE_FILE = "sam_records.json"
+SAM_WINDOW_DAYS = 45
 SAM_API_PAGE_LIMIT = 1000
+SAM_MAX_PAGES = 10
+
+# Raw SAM.gov fields kept in the record store: enough to rescore a notice and
+# to render it, without the rest of the API payload.
+SAM_STORED_FIELDS = [
+    "noticeId", "title", "fullParentPathName", "department", "subtier",
+    "subTier", "office", "description", "solicitationNumber", "naicsCode",
+    "classificationCode", "postedDate", "type", "responseDeadLine",
+    "reponseDeadLine", "uiLink", "additionalInfoLink",
+]
 
 # Narrow SAM.gov before local keyword scoring. Each dictionary becomes one
 # API request. Targeted organization searches prevent space opportunities
@@ -180,6 +979,10 @@ SAM_TARGETED_SEARCHES = [
     {"title": "space"},
 ]
 
+# The targeted searches run in parallel; let all of them reach api.sam.gov at
+# once so the sync takes about as long as one search.
+HTTP_HOST_LIMITS["api.sam.gov"] = len(SAM_TARGETED_SEARCHES)
+
 SAM_INCLUDE_TERMS = [
     # Core space terms
     "space", "space force", "united states space force", "ussf",
@@ -291,6 +1094,109 @@ SAM_EXCLUDE_TERMS = [
     "fire alarm inspection", "elevator maintenance", "portable toilets",
 ]
 
+# Strong, unambiguous signals receive extra weight.
+SAM_STRONG_SIGNALS = [
+    "space force", "space systems command", "space development agency",
+    "satellite", "spacecraft", "orbital", "space domain awareness",
+    "missile warning", "missile tracking", "satcom", "launch vehicle",
+    "national aeronautics and space administration", "nasa",
+]
+
+# Agency affiliation alone must not make an unrelated notice qualify, so these
+# include terms do not count as a space subject match.
+SAM_AGENCY_ONLY_TERMS = {
+    "department of the air force",
+    "united states air force",
+    "air force",
+    "national aeronautics and space administration",
+    "nasa",
+    "air force research laboratory",
+    "afrl",
+    "missile defense agency",
+    "mda",
+    "defense advanced research projects agency",
+    "darpa",
+    "national oceanic and atmospheric administration",
+    "noaa",
+    "national reconnaissance office",
+    "nro",
+    "national geospatial-intelligence agency",
+    "nga",
+}
+
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of lowercase terms. find() returns
+    every term that occurs anywhere in the text (plain substring semantics, the
+    same as `term in text`) in a single pass over the text.
+    """
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.output = [()]
+
+        for term in dict.fromkeys(terms):
+            state = 0
+            for char in term:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.output.append(())
+                state = next_state
+            self.output[state] = self.output[state] + (term,)
+
+        # Breadth-first pass to wire failure links, merge outputs and fold the
+        # failure transitions into a full DFA so find() never backtracks.
+        fail = [0] * len(self.goto)
+        self.delta = [None] * len(self.goto)
+        self.delta[0] = dict(self.goto[0])
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self.delta[state] = {**self.delta[fail[state]], **self.goto[state]}
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail[next_state] = self.delta[fail[state]].get(char, 0)
+                self.output[next_state] = (
+                    self.output[next_state] + self.output[fail[next_state]]
+                )
+
+    def find(self, text):
+        """Return the set of terms found in text."""
+        delta = self.delta
+        output = self.output
+        found = set()
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+def _build_sam_term_weights():
+    """Points per matched term; a term listed twice scores twice, as before."""
+    weights = {}
+    for terms, points in (
+        (SAM_INCLUDE_TERMS, 3),
+        (SAM_AGENCY_TERMS, 4),
+        (SAM_STRONG_SIGNALS, 4),
+    ):
+        for term in terms:
+            weights[term] = weights.get(term, 0) + points
+    return weights
+
+
+SAM_TERM_WEIGHTS = _build_sam_term_weights()
+SAM_EXCLUDE_TERM_SET = frozenset(SAM_EXCLUDE_TERMS)
+SAM_SUBJECT_TERM_SET = frozenset(SAM_INCLUDE_TERMS) - SAM_AGENCY_ONLY_TERMS
+SAM_TERM_MATCHER = TermMatcher(
+    SAM_INCLUDE_TERMS + SAM_AGENCY_TERMS + SAM_EXCLUDE_TERMS + SAM_STRONG_SIGNALS
+)
+
 
 def load_sam_cache():
     """Load previously saved SAM.gov opportunities."""
@@ -329,6 +1235,73 @@ def save_sam_cache(opportunities):
     os.replace(temporary_file, SAM_CACHE_FILE)
 
 
+def load_sam_store():
+    """Load the raw SAM.gov record store used for delta syncs."""
+    try:
+        with open(SAM_STORE_FILE, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            return data
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        pass
+    return {}
+
+
+def save_sam_store(records, high_water_mark):
+    """Save the raw record store and the posted-date high-water mark."""
+    data = {
+        "synced_at": datetime.now(timezone.utc).isoformat(),
+        "high_water_mark": high_water_mark.isoformat() if high_water_mark else None,
+        "records": records,
+    }
+    temporary_file = SAM_STORE_FILE + ".tmp"
+    with open(temporary_file, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=1, ensure_ascii=False, sort_keys=True)
+    os.replace(temporary_file, SAM_STORE_FILE)
+
+
+def trim_sam_record(opportunity):
+    """Keep only the SAM.gov fields used for scoring and display."""
+    return {
+        field: opportunity[field]
+        for field in SAM_STORED_FIELDS
+        if opportunity.get(field) is not None
+    }
+
+
+def parse_sam_deadline(value):
+    """Parse a SAM.gov response deadline into an aware datetime, or None."""
+    if not value:
+        return None
+    try:
+        deadline = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return deadline
+
+
+def age_out_sam_records(records, window_start, now):
+    """
+    Drop stored records whose response deadline has passed or that were
+    posted before the window. Returns how many were removed.
+    """
+    expired_keys = []
+    for unique_key, stored in records.items():
+        record = stored.get("record") or {}
+        deadline = parse_sam_deadline(
+            record.get("responseDeadLine") or record.get("reponseDeadLine")
+        )
+        posted = parse_sam_posted_date(record.get("postedDate"))
+        if (deadline and deadline < now) or (posted and posted < window_start):
+            expired_keys.append(unique_key)
+
+    for unique_key in expired_keys:
+        del records[unique_key]
+    return len(expired_keys)
+
+
 def get_sam_searchable_text(opportunity):
     """Combine available SAM.gov fields for relevance scoring."""
     fields = [
@@ -346,38 +1319,32 @@ def get_sam_searchable_text(opportunity):
     return " ".join(str(value) for value in fields if value).lower()
 
 
-def score_sam_opportunity(opportunity):
-    """Score an opportunity based on broad space relevance."""
-    searchable_text = get_sam_searchable_text(opportunity)
-
-    if any(term in searchable_text for term in SAM_EXCLUDE_TERMS):
-        return -100
-
-    score = 0
+def match_sam_terms(opportunity):
+    """
+    Scan an opportunity once and return its relevance results together:
+    the score (include, agency and strong-signal terms, or -100 when an
+    exclude term is present) and whether it has a real space subject match.
+    """
+    found = SAM_TERM_MATCHER.find(get_sam_searchable_text(opportunity))
 
-    for term in SAM_INCLUDE_TERMS:
-        if term in searchable_text:
-            score += 3
+    if found & SAM_EXCLUDE_TERM_SET:
+        score = -100
+    else:
+        score = sum(SAM_TERM_WEIGHTS.get(term, 0) for term in found)
 
-    for term in SAM_AGENCY_TERMS:
-        if term in searchable_text:
-            score += 4
+    return {
+        "score": score,
+        "subject_match": not SAM_SUBJECT_TERM_SET.isdisjoint(found),
+        "terms": found,
+    }
 
-    # Strong, unambiguous signals receive extra weight.
-    strong_signals = [
-        "space force", "space systems command", "space development agency",
-        "satellite", "spacecraft", "orbital", "space domain awareness",
-        "missile warning", "missile tracking", "satcom", "launch vehicle",
-        "national aeronautics and space administration", "nasa",
-    ]
-    for signal in strong_signals:
-        if signal in searchable_text:
-            score += 4
 
-    return score
+def score_sam_opportunity(opportunity):
+    """Score an opportunity based on broad space relevance."""
+    return match_sam_terms(opportunity)["score"]
 
 
-def normalize_sam_opportunity(opportunity):
+def normalize_sam_opportunity(opportunity, score=None):
     """Convert the SAM.gov response into fields used by the webpage."""
     title = opportunity.get("title") or "Untitled opportunity"
     agency = (
@@ -409,134 +1376,256 @@ def normalize_sam_opportunity(opportunity):
         "solicitation_number": opportunity.get("solicitationNumber"),
         "naics_code": opportunity.get("naicsCode"),
         "link": link,
-        "relevance_score": score_sam_opportunity(opportunity),
+        "relevance_score": (
+            score if score is not None else score_sam_opportunity(opportunity)
+        ),
     }
 
 
-def fetch_sam_search(api_key, posted_from, posted_to, search_params):
-    """Run one targeted SAM.gov search and return its raw records."""
+def sam_search_label(search_params):
+    """Readable label for one targeted search, used in log lines."""
+    return ", ".join(f"{key}={value}" for key, value in search_params.items())
+
+
+def parse_sam_posted_date(value):
+    """Return the date part of a SAM.gov postedDate, or None."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+@recordable(
+    "sam",
+    lambda api_key, posted_from, posted_to, search_params, offset=0: json.dumps(
+        {"search": search_params, "offset": offset}, sort_keys=True
+    ),
+    host="api.sam.gov",
+)
+def fetch_sam_search(api_key, posted_from, posted_to, search_params, offset=0):
+    """Run one page of a targeted SAM.gov search; return (records, total)."""
     params = {
         "api_key": api_key,
         "postedFrom": posted_from.strftime("%m/%d/%Y"),
         "postedTo": posted_to.strftime("%m/%d/%Y"),
         "limit": SAM_API_PAGE_LIMIT,
-        "offset": 0,
+        "offset": offset,
         **search_params,
     }
 
     url = "https://api.sam.gov/opportunities/v2/search?" + urlencode(params)
-    request = Request(
-        url,
-        headers={
-            "User-Agent": "SpaceHeadlinesBot/1.0",
-            "Accept": "application/json",
-        },
-    )
-
-    with urlopen(request, timeout=45) as response:
-        data = json.loads(response.read().decode("utf-8"))
-
-    records = data.get("opportunitiesData", [])
-    label = ", ".join(f"{key}={value}" for key, value in search_params.items())
-    print(f"ℹ️ SAM.gov targeted search ({label}) returned {len(records)} records.")
-    return records
-
+    response = HTTP.get(url, headers={"Accept": "application/json"}, timeout=45)
+    data = json.loads(response.body.decode("utf-8"))
 
-def fetch_sam_opportunities(limit=8):
-    """Fetch and merge targeted, recent space-related SAM.gov opportunities."""
-    api_key = os.environ.get("SAM_API_KEY")
-    if not api_key:
-        raise RuntimeError("SAM_API_KEY is missing.")
+    records = data.get("opportunitiesData") or []
+    try:
+        total_records = int(data.get("totalRecords", len(records)))
+    except (TypeError, ValueError):
+        total_records = len(records)
+    return records, total_records
 
-    today = datetime.now(timezone.utc).date()
-    posted_from = today - timedelta(days=45)
 
-    raw_opportunities = []
-    successful_searches = 0
+def fetch_sam_search_pages(api_key, posted_from, posted_to, search_params):
+    """
+    Walk every page of one targeted search. Stops when the API runs out of
+    records, when SAM_MAX_PAGES is reached, or once a whole page was posted
+    before posted_from.
+    """
+    records = []
+    offset = 0
+    pages = 0
+    label = sam_search_label(search_params)
+    started = perf_counter()
 
-    for search_params in SAM_TARGETED_SEARCHES:
-        try:
-            raw_opportunities.extend(
-                fetch_sam_search(api_key, posted_from, today, search_params)
+    try:
+        while pages < SAM_MAX_PAGES:
+            page, total_records = fetch_sam_search(
+                api_key, posted_from, posted_to, search_params, offset=offset
             )
-            successful_searches += 1
-        except Exception as error:
-            label = ", ".join(
-                f"{key}={value}" for key, value in search_params.items()
+            pages += 1
+            records.extend(page)
+            offset += SAM_API_PAGE_LIMIT
+
+            if len(page) < SAM_API_PAGE_LIMIT or offset >= total_records:
+                break
+
+            posted_dates = [
+                parse_sam_posted_date(record.get("postedDate")) for record in page
+            ]
+            if posted_dates and all(
+                posted and posted < posted_from for posted in posted_dates
+            ):
+                break
+        else:
+            METRICS.count("sam_page_cap_hits")
+            print(
+                f"⚠️ SAM.gov targeted search ({label}) stopped at SAM_MAX_PAGES={SAM_MAX_PAGES}; "
+                f"{total_records - offset} of {total_records} records were not read."
             )
-            print(f"⚠️ SAM.gov targeted search failed ({label}): {error}")
+    except Exception:
+        METRICS.record(
+            "sam_search", perf_counter() - started, "error",
+            search=label, host="api.sam.gov", pages=pages,
+        )
+        raise
+
+    METRICS.record(
+        "sam_search",
+        perf_counter() - started,
+        search=label,
+        host="api.sam.gov",
+        pages=pages,
+        records=len(records),
+    )
+    print(
+        f"ℹ️ SAM.gov targeted search ({label}) "
+        f"returned {len(records)} records over {pages} page(s)."
+    )
+    return records
 
-    if successful_searches == 0:
-        raise RuntimeError("All targeted SAM.gov searches failed.")
 
-    # Deduplicate raw results before relevance scoring.
-    unique_raw = []
-    seen_raw = set()
-    for opportunity in raw_opportunities:
-        unique_key = opportunity.get("noticeId") or (
-            opportunity.get("solicitationNumber"), opportunity.get("title")
-        )
-        if unique_key in seen_raw:
-            continue
-        seen_raw.add(unique_key)
-        unique_raw.append(opportunity)
+def fetch_sam_raw_records(api_key, posted_from, posted_to):
+    """
+    Run all targeted searches at once and return (unique_raw, failed_searches).
+    Results are deduplicated on noticeId as each search finishes.
+    """
+    unique_raw = {}
+    failed_searches = 0
+    cancelled_searches = 0  # cut short by the run deadline
+
+    pool = ThreadPoolExecutor(max_workers=len(SAM_TARGETED_SEARCHES))
+    futures = {
+        pool.submit(
+            fetch_sam_search_pages, api_key, posted_from, posted_to, search_params
+        ): search_params
+        for search_params in SAM_TARGETED_SEARCHES
+    }
 
-    scored_opportunities = []
+    finished = 0
+    try:
+        for future in as_completed(futures, timeout=RUN_BUDGET.remaining()):
+            finished += 1
+            try:
+                records = future.result()
+            except RunBudgetExceeded as error:
+                label = sam_search_label(futures[future])
+                print(f"⚠️ SAM.gov targeted search cancelled at the run deadline ({label}): {error}")
+                cancelled_searches += 1
+                continue
+            except Exception as error:
+                label = sam_search_label(futures[future])
+                print(f"⚠️ SAM.gov targeted search failed ({label}): {error}")
+                failed_searches += 1
+                continue
+
+            for opportunity in records:
+                unique_key = opportunity.get("noticeId") or (
+                    opportunity.get("solicitationNumber"), opportunity.get("title")
+                )
+                unique_raw.setdefault(unique_key, opportunity)
+    except FuturesTimeout:
+        print(f"⚠️ {len(futures) - finished} SAM.gov searches cancelled at the run deadline.")
+        cancelled_searches += len(futures) - finished
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
-    for opportunity in unique_raw:
-        score = score_sam_opportunity(opportunity)
+    if failed_searches + cancelled_searches == len(SAM_TARGETED_SEARCHES):
+        if failed_searches:
+            raise RuntimeError("All targeted SAM.gov searches failed.")
+        raise RunBudgetExceeded("every SAM.gov search was cancelled at the run deadline")
 
-        # Require at least one actual space-related mission or technology term.
-        # Agency affiliation alone must not make an unrelated notice qualify.
-        searchable_text = get_sam_searchable_text(opportunity)
-
-        agency_only_terms = {
-            "department of the air force",
-            "united states air force",
-            "air force",
-            "national aeronautics and space administration",
-            "nasa",
-            "air force research laboratory",
-            "afrl",
-            "missile defense agency",
-            "mda",
-            "defense advanced research projects agency",
-            "darpa",
-            "national oceanic and atmospheric administration",
-            "noaa",
-            "national reconnaissance office",
-            "nro",
-            "national geospatial-intelligence agency",
-            "nga",
-        }
+    # A cancelled search may have missed notices just like a failed one.
+    return unique_raw, failed_searches + cancelled_searches
 
-        has_space_subject_match = any(
-            term in searchable_text
-            for term in SAM_INCLUDE_TERMS
-            if term not in agency_only_terms
-        )
 
-        if not has_space_subject_match:
+def sam_api_key():
+    """The SAM.gov API key, or None. A replay needs no real key."""
+    api_key = os.environ.get("SAM_API_KEY")
+    if not api_key and FIXTURES["mode"] == "replay":
+        api_key = "replay"
+    return api_key
+
+
+def fetch_sam_opportunities(limit=8):
+    """
+    Delta-sync recent space-related SAM.gov opportunities into the raw record
+    store, then return the top-scoring ones. Only notices posted since the
+    store's high-water mark are requested; a full SAM_WINDOW_DAYS pull happens
+    only when the store is missing or too old.
+    """
+    api_key = sam_api_key()
+    if not api_key:
+        raise RuntimeError("SAM_API_KEY is missing.")
+
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    window_start = today - timedelta(days=SAM_WINDOW_DAYS)
+
+    store = {} if fixtures_active() else load_sam_store()
+    records = store.get("records") or {}
+    high_water_mark = parse_sam_posted_date(store.get("high_water_mark"))
+
+    if high_water_mark and window_start <= high_water_mark <= today:
+        # postedFrom is date-only, so re-read the high-water day itself.
+        posted_from = high_water_mark
+        sync_kind = "delta"
+    else:
+        posted_from = window_start
+        records = {}
+        sync_kind = "full"
+
+    unique_raw, failed_searches = fetch_sam_raw_records(api_key, posted_from, today)
+
+    # Rescore only notices that are new or whose stored fields changed.
+    rescored = 0
+    for unique_key, opportunity in unique_raw.items():
+        if not isinstance(unique_key, str):
+            unique_key = "|".join(str(part) for part in unique_key)
+        trimmed = trim_sam_record(opportunity)
+        stored = records.get(unique_key)
+        if stored and stored.get("record") == trimmed:
             continue
 
-        normalized = normalize_sam_opportunity(opportunity)
-        normalized["relevance_score"] = score
-        scored_opportunities.append(normalized)
+        rescored += 1
+        matches = match_sam_terms(trimmed)
 
-    scored_opportunities.sort(
-        key=lambda item: (
-            item.get("relevance_score", 0),
-            item.get("posted_date") or "",
-        ),
-        reverse=True,
-    )
+        # Require at least one actual space-related mission or technology term.
+        # Agency affiliation alone must not make an unrelated notice qualify.
+        if not matches["subject_match"]:
+            records.pop(unique_key, None)
+            continue
+
+        records[unique_key] = {"record": trimmed, "score": matches["score"]}
+
+    expired = age_out_sam_records(records, window_start, now)
+
+    # A search that failed may have missed notices, so the high-water mark
+    # only advances when every search succeeded.
+    if failed_searches == 0:
+        high_water_mark = today
+    save_sam_store(records, high_water_mark)
 
     print(
-        f"✅ SAM.gov merged {len(unique_raw)} unique targeted records; "
-        f"{len(scored_opportunities)} passed the expanded space filter."
+        f"✅ SAM.gov {sync_kind} sync from {posted_from.isoformat()}: "
+        f"{len(unique_raw)} records fetched, {rescored} rescored, "
+        f"{expired} aged out; {len(records)} space-relevant records stored."
     )
 
-    return scored_opportunities[:limit]
+    # Only the top `limit` records are kept and normalized.
+    top_records = heapq.nlargest(
+        limit,
+        records.values(),
+        key=lambda stored: (
+            stored.get("score", 0),
+            stored["record"].get("postedDate") or "",
+        ),
+    )
+    return [
+        normalize_sam_opportunity(stored["record"], stored.get("score", 0))
+        for stored in top_records
+    ]
 
 
 def get_sam_opportunities(limit=8):
@@ -544,15 +1633,24 @@ def get_sam_opportunities(limit=8):
     Use cached opportunities when fresh. If a new API request fails OR returns
     zero relevant records, preserve and display the previous non-empty cache.
     """
-    cache = load_sam_cache()
+    cache = {} if fixtures_active() else load_sam_cache()
     cached_opportunities = cache.get("opportunities", [])
 
     if sam_cache_is_fresh(cache) and cached_opportunities:
         print("ℹ️ Reusing cached SAM.gov opportunities.")
         return cached_opportunities[:limit]
 
+    # A missing key is a configuration problem, not a failing source.
+    if not sam_api_key():
+        print("⚠️ SAM.gov update skipped: SAM_API_KEY is missing.")
+        return cached_opportunities[:limit]
+
+    if not BREAKERS.allow("sam"):
+        return cached_opportunities[:limit]
+
     try:
         opportunities = fetch_sam_opportunities(limit=limit)
+        BREAKERS.success("sam")
 
         if opportunities:
             save_sam_cache(opportunities)
@@ -566,7 +1664,15 @@ def get_sam_opportunities(limit=8):
             return cached_opportunities[:limit]
         return []
 
+    except RunBudgetExceeded as error:
+        print(f"⚠️ SAM.gov update cancelled at the run deadline: {error}")
+        if cached_opportunities:
+            print("ℹ️ Using the previous SAM.gov cache.")
+            return cached_opportunities[:limit]
+        return []
+
     except Exception as error:
+        BREAKERS.failure("sam")
         print(f"⚠️ SAM.gov update failed: {error}")
         if cached_opportunities:
             print("ℹ️ Using the previous SAM.gov cache.")
@@ -597,6 +1703,16 @@ def format_sam_date(value):
     return str(value)
 
 
+SAM_AGENCY_ACRONYMS = {
+    "nasa": "NASA", "noaa": "NOAA", "darpa": "DARPA",
+    "ussf": "USSF", "usaf": "USAF", "afrl": "AFRL",
+    "dod": "DoD", "ssc": "SSC", "sda": "SDA",
+}
+SAM_AGENCY_ACRONYM_PATTERN = re.compile(
+    r"\b(?:" + "|".join(SAM_AGENCY_ACRONYMS) + r")\b", re.I
+)
+
+
 def format_sam_agency(value):
     """Shorten SAM.gov's long agency hierarchy for display."""
     if not value:
@@ -608,64 +1724,1049 @@ def format_sam_agency(value):
     if agency.isupper():
         agency = agency.title()
 
-    replacements = {
-        "Nasa": "NASA", "Noaa": "NOAA", "Darpa": "DARPA",
-        "Ussf": "USSF", "Usaf": "USAF", "Afrl": "AFRL",
-        "Dod": "DoD", "Ssc": "SSC", "Sda": "SDA",
-    }
-    for old, new in replacements.items():
-        agency = re.sub(rf"\b{re.escape(old)}\b", new, agency, flags=re.I)
-    return agency
+    return SAM_AGENCY_ACRONYM_PATTERN.sub(
+        lambda match: SAM_AGENCY_ACRONYMS[match.group(0).lower()], agency
+    )
 
 # ============================================================
 # END SAM.GOV — SPACE ACQUISITION WATCH
 
 
-# CONVERT TIMESTAMP TO "Xh ago" or "Xm ago"
-def get_age_string(timestamp):
-    now = datetime.now(timezone.utc)
-    delta = now - timestamp
-    minutes = int(delta.total_seconds() / 60)
-    if minutes < 1:
-        return "just now"
-    elif minutes < 60:
-        return f"about {minutes}m ago"
-    elif minutes < 1440:
-        hours = minutes // 60
-        return f"about {hours}h ago"
-    else:
-        days = minutes // 1440
-        return f"about {days}d ago"
+# ============================================================
+# FEED FETCHING
+# Downloads every feed in parallel, then hands the raw bytes to
+# feedparser. One slow host no longer holds up the whole run.
+# ETag / Last-Modified validators are cached between runs so an
+# unchanged feed answers 304 and its last entries are reused.
+# ============================================================
 
-# ⏱️ Allow articles from the past 48 hours
-cutoff = datetime.now(timezone.utc) - timedelta(hours=48)
-all_items = []
+FEED_FETCH_TIMEOUT = 20
+FEED_FETCH_WORKERS = 8
+FEED_CACHE_FILE = "feed_cache.json"
+
+
+def load_feed_cache():
+    """Load saved feed validators and entries, keyed by feed URL."""
+    try:
+        with open(FEED_CACHE_FILE, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            return data
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        pass
+    return {}
+
+
+def save_feed_cache(cache):
+    """Save feed validators and entries for later workflow runs."""
+    temporary_file = FEED_CACHE_FILE + ".tmp"
+    with open(temporary_file, "w", encoding="utf-8") as file:
+        json.dump(cache, file, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(temporary_file, FEED_CACHE_FILE)
+
+
+@recordable("feed", lambda url, *args, **kwargs: url)
+def fetch_feed(url, timeout=FEED_FETCH_TIMEOUT, etag=None, modified=None):
+    """
+    Download one feed with a conditional GET. Returns a dict with the HTTP
+    status, the raw body (None on 304) and the response validators.
+    """
+    headers = {
+        "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8",
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+
+    response = HTTP.get(url, headers=headers, timeout=timeout)
+    if response.status == 304:
+        return {"status": 304, "body": None, "etag": etag, "modified": modified}
+    return {
+        "status": response.status,
+        "body": response.body,
+        "etag": response.headers.get("ETag"),
+        "modified": response.headers.get("Last-Modified"),
+    }
+
+
+def fetch_all_feeds(feed_urls, cache=None, timeout=FEED_FETCH_TIMEOUT, workers=FEED_FETCH_WORKERS):
+    """
+    Download all feeds concurrently. Returns (source, result) pairs in the same
+    order as feed_urls; result is None when that feed failed, timed out, is
+    skipped by its circuit breaker or was still running at the run deadline.
+    """
+    cache = cache or {}
+    items = [
+        (source, url)
+        for source, url in feed_urls.items()
+        if BREAKERS.allow(f"feed:{source}")
+    ]
+    cancelled = set()  # cut short by the run deadline; not a breaker failure
+
+    def fetch_one(pair):
+        source, url = pair
+        # A recorded 304 would have no body to replay.
+        cached = {} if fixtures_active() else cache.get(url) or {}
+        host = urlparse(url).netloc
+        started = perf_counter()
+        try:
+            result = fetch_feed(
+                url,
+                timeout=timeout,
+                etag=cached.get("etag"),
+                modified=cached.get("modified"),
+            )
+        except RunBudgetExceeded as error:
+            METRICS.record("feed_fetch", perf_counter() - started, "cancelled", source=source, host=host)
+            METRICS.count("feeds_cancelled")
+            print(f"⚠️ Feed fetch cancelled at the run deadline ({source}): {error}")
+            cancelled.add(source)
+            return source, None
+        except Exception as error:
+            METRICS.record("feed_fetch", perf_counter() - started, "error", source=source, host=host)
+            METRICS.count("feeds_failed")
+            print(f"⚠️ Feed fetch failed ({source}): {error}")
+            return source, None
+
+        METRICS.record(
+            "feed_fetch",
+            perf_counter() - started,
+            source=source,
+            host=host,
+            http_status=result["status"],
+            bytes=len(result["body"] or b""),
+        )
+        METRICS.count("feeds_not_modified" if result["status"] == 304 else "feeds_downloaded")
+        return source, result
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(items))))
+    futures = {pool.submit(fetch_one, pair): pair[0] for pair in items}
+    done, stragglers = wait(futures, timeout=RUN_BUDGET.remaining())
+    # Stragglers are abandoned; their socket timeouts end at the deadline too.
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for future in done:
+        source, result = future.result()
+        results[source] = result
+        if result is not None:
+            BREAKERS.success(f"feed:{source}")
+        elif source not in cancelled:
+            BREAKERS.failure(f"feed:{source}")
+    for future in stragglers:
+        METRICS.count("feeds_cancelled")
+        print(f"⚠️ Feed fetch cancelled at the run deadline ({futures[future]}).")
+    return [(source, results.get(source)) for source in feed_urls]
+
+
+def parse_feed(body, cutoff):
+    """
+    Parse a feed body. Returns a dict with the title/link/timestamp entries
+    newer than cutoff, the publish times of the newest dated entries (used
+    to learn the feed's publish rate) and the feed's own polling hint in
+    seconds. RSS 2.0 and Atom take the streaming fast path; everything else,
+    and anything the fast path rejects, goes through feedparser.
+    """
+    from xml.etree.ElementTree import ParseError
 
-# PARSE EACH FEED
-for source, url in feeds.items():
-    parsed = feedparser.parse(url)
+    try:
+        parsed = parse_feed_fast(body, cutoff)
+    except (ParseError, ValueError, LookupError):
+        # FeedFastPathError is a ValueError; LookupError is an unknown encoding.
+        METRICS.count("feed_parse_fallbacks")
+        parsed = parse_feed_with_feedparser(body, cutoff)
+    parsed["poll_hint"] = parse_feed_poll_hint(body)
+    return parsed
+
+
+def parse_feed_with_feedparser(body, cutoff):
+    """parse_feed() for any feed feedparser understands."""
+    import feedparser
+
+    parsed = feedparser.parse(body)
+    entries = []
+    published = []
     for entry in parsed.entries:
         pub = entry.get("published_parsed") or entry.get("updated_parsed")
         if not pub:
             continue
-        timestamp = datetime.fromtimestamp(mktime(pub), tz=timezone.utc)
+        timestamp = feed_timestamp(pub)
+        published.append(timestamp)
         if timestamp < cutoff:
             continue
-
-        all_items.append({
-            "source": source,
+        entries.append({
             "title": entry.title,
             "link": entry.link,
             "timestamp": timestamp,
-            # 👇 image chosen purely from keywords/source (no scraping)
-            "image": pick_image_for(entry.title, source),
-            "age": get_age_string(timestamp)
         })
+    return {"entries": entries, "published": published}
+
+
+# ---------- streaming fast path ----------
+# Well-formed RSS 2.0 and Atom feeds are read with ElementTree's iterparse,
+# keeping only each item's title, link and date. Reading stops once the
+# feed, newest first, has fallen behind the cutoff and enough publish times
+# are known for the poll scheduler. Anything this path does not handle the
+# way feedparser would (RSS 1.0, HTML in titles, relative links, odd dates)
+# raises FeedFastPathError and the feed is parsed by feedparser instead.
+ATOM_NAMESPACE = "{http://www.w3.org/2005/Atom}"
+FEED_PUBLISHED_TAGS = frozenset([
+    "pubDate",
+    "{http://purl.org/dc/terms/}issued",
+    ATOM_NAMESPACE + "published",
+    ATOM_NAMESPACE + "issued",
+])
+FEED_UPDATED_TAGS = frozenset([
+    "{http://purl.org/dc/elements/1.1/}date",
+    "{http://purl.org/dc/terms/}modified",
+    ATOM_NAMESPACE + "updated",
+    ATOM_NAMESPACE + "modified",
+])
+FEED_ENCODING_PATTERN = re.compile(rb"""<\?xml[^>]*encoding=["']([\w.-]+)["']""")
+HTMLISH_TEXT_PATTERN = re.compile(r"<|&#?\w+;")
+# parsedate_tz() reads a missing or unknown zone as +0000, so only dates
+# that end in a zone it really knows are taken on the fast path.
+RFC822_ZONE_PATTERN = re.compile(r"\s(?:[+-]\d{4}|UTC?|GMT|Z|[ACEMP][SD]T)$", re.IGNORECASE)
+# Relative links (e.g. under xml:base) are resolved by feedparser only.
+ABSOLUTE_LINK_PATTERN = re.compile(r"https?://[^\s/]", re.IGNORECASE)
+
+
+class FeedFastPathError(ValueError):
+    """The feed uses something only feedparser handles."""
+
+
+def feed_timestamp(parsed_time):
+    """UTC datetime for a feed's UTC struct_time, as feedparser entries are read."""
+    return datetime.fromtimestamp(mktime(parsed_time), tz=timezone.utc)
+
+
+def parse_feed_date(text, tag):
+    """UTC struct_time for an RSS (RFC 822) or Atom/Dublin Core (ISO 8601) date."""
+    text = (text or "").strip()
+    if tag == "pubDate":
+        from email.utils import mktime_tz, parsedate_tz
+
+        if not RFC822_ZONE_PATTERN.search(text):
+            raise FeedFastPathError(f"date without a time zone {text!r}")
+        parsed = parsedate_tz(text)
+        if parsed is None:
+            raise FeedFastPathError(f"unparsed date {text!r}")
+        return gmtime(mktime_tz(parsed))
+
+    try:
+        moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        raise FeedFastPathError(f"unparsed date {text!r}") from None
+    if moment.tzinfo is None:
+        raise FeedFastPathError(f"date without a time zone {text!r}")
+    return moment.utctimetuple()
+
+
+def _plain_feed_text(text, utf8):
+    """Title or link text as feedparser returns it for plain-text content."""
+    text = (text or "").strip()
+    if HTMLISH_TEXT_PATTERN.search(text):
+        raise FeedFastPathError("markup in text")
+    if utf8:
+        # feedparser repairs UTF-8 that was decoded as Latin-1 somewhere.
+        try:
+            text = text.encode("iso-8859-1").decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return text
+
+
+def parse_feed_fast(body, cutoff):
+    """
+    parse_feed() for well-formed RSS 2.0 and Atom via iterparse. Returns
+    {"entries", "published"} or raises (FeedFastPathError, ParseError).
+    """
+    from xml.etree.ElementTree import iterparse
+
+    declared = FEED_ENCODING_PATTERN.search(body[:200])
+    utf8 = declared is None or declared.group(1).lower() in (b"utf-8", b"utf8")
+
+    entries = []
+    published = []
+    newest_first = True
+    stack = []
+    item_tag = None
+    item = None
+
+    for event, element in iterparse(io.BytesIO(body), events=("start", "end")):
+        if event == "start":
+            if not stack:
+                if element.tag == "rss":
+                    item_tag = "item"
+                elif element.tag == ATOM_NAMESPACE + "feed":
+                    item_tag = ATOM_NAMESPACE + "entry"
+                else:
+                    raise FeedFastPathError(f"unsupported root {element.tag}")
+            elif element.tag == item_tag and item is None:
+                item = {"depth": len(stack)}
+            stack.append(element)
+            continue
+
+        stack.pop()
+        if item is None:
+            continue
+
+        if len(stack) == item["depth"] + 1:
+            # A direct child of the item.
+            tag = element.tag
+            if tag in ("title", ATOM_NAMESPACE + "title"):
+                if element.get("type") == "xhtml":
+                    raise FeedFastPathError("xhtml title")
+                item["title"] = _plain_feed_text(element.text, utf8)
+            elif tag == "link":
+                item["link"] = _plain_feed_text(element.text, utf8)
+            elif tag == ATOM_NAMESPACE + "link":
+                if element.get("rel", "alternate") == "alternate" and "link" not in item:
+                    item["link"] = _plain_feed_text(element.get("href"), utf8)
+            elif tag in FEED_PUBLISHED_TAGS and "published" not in item:
+                item["published"] = parse_feed_date(element.text, tag)
+            elif tag in FEED_UPDATED_TAGS and "updated" not in item:
+                item["updated"] = parse_feed_date(element.text, tag)
+            continue
+
+        if len(stack) != item["depth"] or element.tag != item_tag:
+            continue
+
+        # The item is complete.
+        finished, item = item, None
+        stack[-1].remove(element)
+        parsed_time = finished.get("published") or finished.get("updated")
+        if not parsed_time:
+            continue
+        if "title" not in finished or "link" not in finished:
+            raise FeedFastPathError("item without a title or link")
+        if not ABSOLUTE_LINK_PATTERN.match(finished["link"]):
+            raise FeedFastPathError(f"relative link {finished['link']!r}")
+
+        timestamp = feed_timestamp(parsed_time)
+        if published and timestamp > published[-1]:
+            newest_first = False
+        published.append(timestamp)
+
+        if timestamp < cutoff:
+            if newest_first and len(published) > FEED_POLL_GAP_SAMPLES:
+                # Everything further down is older still.
+                break
+            continue
+
+        entries.append({
+            "title": finished["title"],
+            "link": finished["link"],
+            "timestamp": timestamp,
+        })
+
+    return {"entries": entries, "published": published}
+
+
+def parse_feed_entries(body, cutoff):
+    """Parse a feed body into title/link/timestamp dicts newer than cutoff."""
+    return parse_feed(body, cutoff)["entries"]
+
+
+def serialize_feed_entries(entries):
+    """Convert parsed entries into JSON-safe dicts for the feed cache."""
+    return [
+        {
+            "title": entry["title"],
+            "link": entry["link"],
+            "published": entry["timestamp"].isoformat(),
+        }
+        for entry in entries
+    ]
+
+
+def deserialize_feed_entries(cached_entries, cutoff):
+    """Restore cached entries, dropping any that have aged past cutoff."""
+    entries = []
+    for entry in cached_entries or []:
+        try:
+            timestamp = datetime.fromisoformat(entry["published"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if timestamp < cutoff:
+            continue
+        entries.append({
+            "title": entry.get("title") or "",
+            "link": entry.get("link") or "",
+            "timestamp": timestamp,
+        })
+    return entries
+
+# ---------- adaptive polling ----------
+# Each feed gets its own poll interval, learned from the gaps between its
+# entries: a feed that posts every 20 minutes is polled about every 5, one
+# that posts twice a week backs off to FEED_POLL_MAX. Consecutive 304s (or
+# unchanged bodies) stretch the interval further; new entries reset it.
+# A feed's own <ttl> / sy:updatePeriod hint is honored as a lower bound, up
+# to FEED_POLL_HINT_CAP so a generic "hourly" hint can't make busy feeds stale.
+
+FEED_POLL_MIN = 5 * 60
+FEED_POLL_MAX = 2 * 60 * 60
+FEED_POLL_HINT_CAP = 15 * 60
+FEED_POLL_GAP_FRACTION = 0.25
+FEED_POLL_BACKOFF = 1.5
+FEED_POLL_SLACK = 60  # poll feeds coming due within a minute of this run
+FEED_POLL_GAP_SAMPLES = 10
+
+SY_UPDATE_PERIODS = {
+    "hourly": 60 * 60,
+    "daily": 24 * 60 * 60,
+    "weekly": 7 * 24 * 60 * 60,
+    "monthly": 30 * 24 * 60 * 60,
+    "yearly": 365 * 24 * 60 * 60,
+}
+FEED_TTL_PATTERN = re.compile(rb"<ttl>\s*(\d+)\s*</ttl>", re.I)
+SY_PERIOD_PATTERN = re.compile(rb"<sy:updatePeriod>\s*(\w+)\s*</sy:updatePeriod>", re.I)
+SY_FREQUENCY_PATTERN = re.compile(rb"<sy:updateFrequency>\s*(\d+)\s*</sy:updateFrequency>", re.I)
+
+
+def parse_feed_poll_hint(body):
+    """Return the feed's <ttl> or sy:updatePeriod hint in seconds, or None."""
+    # The hints live in the channel header, before the first item.
+    head = (body or b"")[:8192]
+    ttl = FEED_TTL_PATTERN.search(head)
+    if ttl:
+        return int(ttl.group(1)) * 60
+
+    period = SY_PERIOD_PATTERN.search(head)
+    if period:
+        seconds = SY_UPDATE_PERIODS.get(period.group(1).decode("ascii", "ignore").lower())
+        if seconds:
+            frequency = SY_FREQUENCY_PATTERN.search(head)
+            return seconds // max(1, int(frequency.group(1)) if frequency else 1)
+    return None
+
+
+def estimate_publish_gap(published):
+    """Median seconds between the newest entries, or None if unknown."""
+    newest = sorted(published, reverse=True)[:FEED_POLL_GAP_SAMPLES + 1]
+    gaps = [
+        (newer - older).total_seconds()
+        for newer, older in zip(newest, newest[1:])
+        if newer > older
+    ]
+    if not gaps:
+        return None
+    gaps.sort()
+    return gaps[len(gaps) // 2]
+
+
+def feed_poll_interval(cached):
+    """Seconds until this feed should be polled again."""
+    cached = cached or {}
+    publish_gap = cached.get("publish_gap")
+    interval = publish_gap * FEED_POLL_GAP_FRACTION if publish_gap else FEED_POLL_MAX
+    interval *= FEED_POLL_BACKOFF ** cached.get("not_modified_streak", 0)
+    interval = max(interval, min(cached.get("poll_hint") or 0, FEED_POLL_HINT_CAP))
+    return int(min(FEED_POLL_MAX, max(FEED_POLL_MIN, interval)))
+
+
+def schedule_next_poll(cached, now=None):
+    """Store the feed's next poll interval and time in its cache entry."""
+    now = now or datetime.now(timezone.utc)
+    interval = feed_poll_interval(cached)
+    cached["poll_interval"] = interval
+    cached["next_poll"] = (now + timedelta(seconds=interval)).isoformat()
+    return interval
+
+
+def feed_is_due(cached, now=None):
+    """True when a feed has no schedule yet or its next poll has come."""
+    next_poll = (cached or {}).get("next_poll")
+    if not next_poll:
+        return True
+    now = now or datetime.now(timezone.utc)
+    try:
+        due_at = datetime.fromisoformat(next_poll)
+    except (TypeError, ValueError):
+        return True
+    return due_at <= now + timedelta(seconds=FEED_POLL_SLACK)
+
+# ============================================================
+# END FEED FETCHING
+# ============================================================
+
+
+# ============================================================
+# ARTICLE STORE — SQLITE
+# Every parsed entry is kept in an embedded SQLite database with
+# a unique index on its canonical link. Each run inserts only
+# entries it has not seen before, and clusters each one with
+# near-duplicates from other sources; the 48 h window is one
+# indexed scan instead of an in-memory rebuild.
+# ============================================================
+
+ARTICLE_DB_FILE = "articles.db"
+
+# ---------- near-duplicate clustering ----------
+# The same story from several outlets is grouped when it is stored. Titles
+# become normalized token sets; MinHash signatures of those sets are cut
+# into LSH bands and kept in article_buckets. A new article only compares
+# itself against articles sharing a bucket, and joins the cluster of the
+# most similar one when the exact Jaccard similarity is high enough.
+CLUSTER_SIMILARITY = 0.5
+# When both titles have words the other lacks, they usually name different
+# things ("selects SpaceX" / "selects Blue Origin"); only near-identical
+# titles are then allowed to match.
+CLUSTER_SWAP_SIMILARITY = 0.8
+CLUSTER_MIN_SHARED_TOKENS = 3
+CLUSTER_WINDOW_HOURS = 48
+CLUSTER_MAX_CANDIDATES = 20
+MINHASH_BANDS = 8
+MINHASH_ROWS = 2
+MINHASH_PRIME = (1 << 61) - 1
+MINHASH_PARAMETERS = [
+    ((n + 1) * 0x9E3779B97F4A7C15 % MINHASH_PRIME | 1, (n + 1) * 0xC2B2AE3D27D4EB4F % MINHASH_PRIME)
+    for n in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+TITLE_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its new of on "
+    "or over says than that the this to up with will after first".split()
+)
+TITLE_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def title_tokens(title):
+    """Lowercased title words without stopwords, with a plural 's' trimmed."""
+    tokens = set()
+    for word in TITLE_TOKEN_PATTERN.findall((title or "").lower()):
+        if word in TITLE_STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return tokens
+
+
+def minhash_buckets(tokens):
+    """One LSH bucket id per band of the MinHash signature of tokens."""
+    if len(tokens) < CLUSTER_MIN_SHARED_TOKENS:
+        return []
+    hashes = [zlib.crc32(token.encode("utf-8")) for token in tokens]
+    signature = [
+        min((a * value + b) % MINHASH_PRIME for value in hashes)
+        for a, b in MINHASH_PARAMETERS
+    ]
+    buckets = []
+    for band in range(MINHASH_BANDS):
+        bucket = band + 1
+        for value in signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]:
+            bucket = (bucket * 1000003 + value) % MINHASH_PRIME
+        buckets.append(bucket)
+    return buckets
+
+
+def assign_cluster(connection, link, title, published):
+    """
+    Returns (cluster, buckets) for a new article: the cluster of its most
+    similar earlier article within CLUSTER_WINDOW_HOURS, or its own link.
+    """
+    tokens = title_tokens(title)
+    buckets = minhash_buckets(tokens)
+    if not buckets:
+        return link, buckets
+
+    window = CLUSTER_WINDOW_HOURS * 60 * 60
+    # Articles sharing more buckets are likelier to be similar, so only the
+    # best few candidates are compared exactly.
+    candidates = connection.execute(
+        "SELECT articles.link, articles.title, "
+        "COALESCE(articles.cluster, articles.link) FROM article_buckets "
+        "JOIN articles ON articles.link = article_buckets.link "
+        f"WHERE article_buckets.bucket IN ({', '.join('?' * len(buckets))}) "
+        "AND articles.link != ? AND articles.published BETWEEN ? AND ? "
+        "GROUP BY articles.link ORDER BY COUNT(*) DESC LIMIT ?",
+        (*buckets, link, published - window, published + window, CLUSTER_MAX_CANDIDATES),
+    )
+
+    best_cluster, best_similarity = link, 0.0
+    for _, candidate_title, cluster in candidates:
+        similarity = title_similarity(tokens, title_tokens(candidate_title))
+        if similarity and similarity >= best_similarity:
+            best_cluster, best_similarity = cluster, similarity
+    return best_cluster, buckets
+
+
+def title_similarity(tokens, other_tokens):
+    """
+    Jaccard similarity of two titles' tokens when they look like the same
+    story, else 0.0.
+    """
+    shared = len(tokens & other_tokens)
+    if shared < CLUSTER_MIN_SHARED_TOKENS:
+        return 0.0
+    # "Starlink Group 10-3" and "Group 10-4" are different launches.
+    numbers = {token for token in tokens if token.isdigit()}
+    other_numbers = {token for token in other_tokens if token.isdigit()}
+    if numbers and other_numbers and numbers != other_numbers:
+        return 0.0
+    similarity = shared / len(tokens | other_tokens)
+    # One title adding words to the other is the same story; each having its
+    # own words is a swap, and needs a much closer match.
+    swapped = len(tokens) > shared and len(other_tokens) > shared
+    if similarity < (CLUSTER_SWAP_SIMILARITY if swapped else CLUSTER_SIMILARITY):
+        return 0.0
+    return similarity
+
+
+def prune_cluster_buckets(connection, cutoff):
+    """Drop LSH buckets of articles too old to be matched again."""
+    connection.execute(
+        "DELETE FROM article_buckets WHERE published < ?",
+        (int(cutoff.timestamp()),),
+    )
+
+
+# ---------- link canonicalization ----------
+# Feeds link the same article in several spellings: http and https, with
+# utm_* and click-id parameters, as an AMP page, with or without a trailing
+# slash. clean_link() drops what only tracks or reformats the page and is
+# the link the page shows; canonical_link() also folds the remaining
+# spelling differences and is the store's dedup key.
+TRACKING_PARAMETERS = frozenset([
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "cmpid", "ref", "ref_src", "sr_share", "spm",
+])
+# AMP switches: a bare "amp" parameter, or these parameters set to "amp".
+AMP_PARAMETERS = frozenset(["outputtype", "output", "format"])
+
+
+def _is_dropped_parameter(piece):
+    """True when a raw "name=value" query piece tracks clicks or selects AMP."""
+    name, _, value = piece.partition("=")
+    name = unquote(name).lower()
+    if name.startswith("utm_") or name in TRACKING_PARAMETERS:
+        return True
+    return name == "amp" or (name in AMP_PARAMETERS and value.lower() == "amp")
+
+
+def _strip_amp_path(path):
+    """/story/amp/, /amp/story and story.amp.html all become the story's path."""
+    lowered = path.lower()
+    if lowered.endswith("/amp/"):
+        path = path[:-len("amp/")]
+    elif lowered.endswith("/amp"):
+        path = path[:-len("amp")]
+    if path.lower().startswith("/amp/"):
+        path = path[len("/amp"):]
+    if path.lower().endswith(".amp.html"):
+        path = path[:-len(".amp.html")] + ".html"
+    return path or "/"
+
+
+def clean_link(link):
+    """
+    The article link without whitespace, fragment, tracking parameters or
+    AMP markers. The scheme and remaining parameters are kept exactly as the
+    feed gave them, so the link still opens the publisher's page.
+    """
+    link = (link or "").strip()
+    parts = urlsplit(link)
+    if not parts.netloc:
+        return link.split("#", 1)[0]
+
+    host = parts.netloc.lower()
+    if host.startswith("amp."):
+        host = host[len("amp."):]
+    query = "&".join(
+        piece
+        for piece in parts.query.split("&")
+        if piece and not _is_dropped_parameter(piece)
+    )
+    return urlunsplit((parts.scheme, host, _strip_amp_path(parts.path), query, ""))
+
+
+def canonical_link(link):
+    """
+    The store's dedup key for an article link: clean_link() without the
+    scheme, default port, www./m. host prefix or trailing slash, and with
+    its parameters sorted.
+    """
+    link = clean_link(link)
+    parts = urlsplit(link)
+    if not parts.netloc:
+        return link
+
+    host = parts.netloc
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    for port in (":80", ":443"):
+        if host.endswith(port):
+            host = host[:-len(port)]
+    query = "&".join(sorted(parts.query.split("&"))) if parts.query else ""
+    return host + parts.path.rstrip("/") + ("?" + query if query else "")
+
+
+def open_article_store(path=ARTICLE_DB_FILE):
+    """Open (and create if needed) the article store."""
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS articles (
+            link TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            title TEXT NOT NULL,
+            published INTEGER NOT NULL,
+            first_seen INTEGER NOT NULL,
+            cluster TEXT,
+            link_key TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_articles_published
+            ON articles (published);
+        CREATE INDEX IF NOT EXISTS idx_articles_source_published
+            ON articles (source, published);
+        CREATE TABLE IF NOT EXISTS article_buckets (
+            bucket INTEGER NOT NULL,
+            link TEXT NOT NULL,
+            published INTEGER NOT NULL,
+            PRIMARY KEY (bucket, link)
+        ) WITHOUT ROWID;
+    """)
+
+    columns = {row["name"] for row in connection.execute("PRAGMA table_info(articles)")}
+    if "cluster" not in columns:
+        # Stores created before clustering: add the column and cluster the
+        # recent articles once, oldest first, as if they had just arrived.
+        connection.execute("ALTER TABLE articles ADD COLUMN cluster TEXT")
+        since = datetime.now(timezone.utc) - timedelta(hours=2 * CLUSTER_WINDOW_HOURS)
+        rows = connection.execute(
+            "SELECT link, title, published FROM articles "
+            "WHERE published >= ? ORDER BY published",
+            (int(since.timestamp()),),
+        ).fetchall()
+        for row in rows:
+            cluster, buckets = assign_cluster(connection, row["link"], row["title"], row["published"])
+            connection.execute("UPDATE articles SET cluster = ? WHERE link = ?", (cluster, row["link"]))
+            connection.executemany(
+                "INSERT OR IGNORE INTO article_buckets (bucket, link, published) VALUES (?, ?, ?)",
+                [(bucket, row["link"], row["published"]) for bucket in buckets],
+            )
+        connection.commit()
+
+    if "link_key" not in columns:
+        # Stores created before canonical links: key every article, oldest
+        # first, and drop the later copies of an article seen twice.
+        connection.execute("ALTER TABLE articles ADD COLUMN link_key TEXT")
+        seen = set()
+        duplicates = []
+        keys = []
+        for row in connection.execute("SELECT link FROM articles ORDER BY first_seen, published"):
+            key = canonical_link(row["link"])
+            if key in seen:
+                duplicates.append((row["link"],))
+            else:
+                seen.add(key)
+                keys.append((key, row["link"]))
+        connection.executemany("DELETE FROM articles WHERE link = ?", duplicates)
+        connection.executemany("DELETE FROM article_buckets WHERE link = ?", duplicates)
+        connection.executemany("UPDATE articles SET link_key = ? WHERE link = ?", keys)
+        connection.commit()
+
+    connection.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_link_key ON articles (link_key)"
+    )
+    return connection
+
+
+def store_articles(connection, source, entries):
+    """
+    Insert entries not already in the store, each assigned to a cluster of
+    near-duplicates. An entry whose canonical link is already stored, from
+    this feed, another feed or an earlier run, is skipped. Returns how many
+    were new.
+    """
+    first_seen = int(datetime.now(timezone.utc).timestamp())
+    new_count = 0
+    for entry in entries:
+        link = clean_link(entry["link"])
+        if not link:
+            continue
+        key = canonical_link(link)
+        if connection.execute("SELECT 1 FROM articles WHERE link_key = ?", (key,)).fetchone():
+            continue
+
+        published = int(entry["timestamp"].timestamp())
+        cluster, buckets = assign_cluster(connection, link, entry["title"], published)
+        inserted = connection.execute(
+            "INSERT OR IGNORE INTO articles "
+            "(link, source, title, published, first_seen, cluster, link_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (link, source, entry["title"], published, first_seen, cluster, key),
+        )
+        if not inserted.rowcount:
+            continue
+        connection.executemany(
+            "INSERT OR IGNORE INTO article_buckets (bucket, link, published) VALUES (?, ?, ?)",
+            [(bucket, link, published) for bucket in buckets],
+        )
+        new_count += 1
+    return new_count
+
+
+def article_from_row(row):
+    """Turn a stored row into the item dict used for rendering."""
+    timestamp = datetime.fromtimestamp(row["published"], tz=timezone.utc)
+    return {
+        "source": row["source"],
+        "title": row["title"],
+        "link": row["link"],
+        "timestamp": timestamp,
+        # 👇 image chosen purely from keywords/source (no scraping)
+        "image": pick_image_for(row["title"], row["source"]),
+    }
+
+
+def iter_window_articles(connection, cutoff):
+    """
+    Every article published since cutoff as (link, source, title, published,
+    cluster) tuples, newest first. The rows stream straight off idx_articles_published
+    walked backwards, so nothing is sorted, and a HeadlineSelector fed in
+    this order rejects most rows with a single comparison.
+    """
+    cursor = connection.cursor()
+    cursor.row_factory = None
+    return cursor.execute(
+        "SELECT link, source, title, published, COALESCE(cluster, link) FROM articles "
+        "WHERE published >= ? ORDER BY published DESC",
+        (int(cutoff.timestamp()),),
+    )
+
+
+class HeadlineSelector:
+    """
+    Streaming top-k over the article window. Rows are fed as they are read
+    and kept in bounded min-heaps: the newest per_source for each source and
+    the newest overall. Memory stays at sources × per_source + overall rows,
+    and each row costs O(log k), however many sources or hours the window
+    holds.
+
+    Each cluster of near-duplicates is shown once. Rows arrive newest first,
+    so the first row of a cluster that a source column takes becomes its
+    representative and later ones are only listed as its alternates. A row
+    taken only for the summary list does not suppress other sources' copies;
+    the cluster is just not summarized twice. Only clusters with a row in a
+    heap are remembered, so this state stays as small as the heaps.
+    """
+
+    def __init__(self, per_source, overall):
+        self.per_source = per_source
+        # The top story is the newest overall, so keep at least one.
+        self.overall = max(1, overall)
+        self.by_source = {}
+        self.latest = []
+        self.representatives = {}
+        self.alternates = {}
+        self.summarized = set()
+        self.top_source = None
+
+    def extend(self, rows):
+        """
+        Offer (link, source, title, published, cluster) rows, newest first.
+        A row older than the oldest one a full heap keeps is rejected on its
+        timestamp alone; ties fall back to comparing (published, link).
+        """
+        by_source = self.by_source
+        latest = self.latest
+        per_source = self.per_source
+        overall = self.overall
+        push = heapq.heappush
+        replace = heapq.heapreplace
+        representatives = self.representatives
+        alternates = self.alternates
+        summarized = self.summarized
+        top_source = self.top_source
+
+        for link, source, title, published, cluster in rows:
+            representative = representatives.get(cluster)
+            if representative is not None:
+                alternates.setdefault(representative, []).append((source, link))
+                continue
+
+            heap = by_source.get(source)
+            if heap is None:
+                heap = by_source[source] = []
+                if top_source is None:
+                    # The first row is the top story; its column skips it,
+                    # so that source keeps one spare row. Every other row a
+                    # column takes is shown there.
+                    top_source = self.top_source = source
+
+            if len(heap) < per_source + (source == top_source):
+                push(heap, (published, link, source, title))
+                representatives[cluster] = link
+            elif published >= heap[0][0]:
+                entry = (published, link, source, title)
+                if entry > heap[0]:
+                    replace(heap, entry)
+                    representatives[cluster] = link
+
+            if len(latest) < overall:
+                if cluster not in summarized:
+                    push(latest, (published, link, source, title))
+                    summarized.add(cluster)
+            elif published >= latest[0][0] and cluster not in summarized:
+                entry = (published, link, source, title)
+                if entry > latest[0]:
+                    replace(latest, entry)
+                    summarized.add(cluster)
+
+    def result(self):
+        """
+        (latest, top_story, sources), newest first: the overall newest
+        articles, the single newest one, and up to per_source per source
+        with the top story left out. Each item lists the other sources that
+        carried the same story under "alternates".
+        """
+        items = {}
+
+        def item(entry):
+            published, link, source, title = entry
+            if link not in items:
+                article = article_from_row({
+                    "link": link,
+                    "source": source,
+                    "title": title,
+                    "published": published,
+                })
+                alternates = {}
+                for alternate_source, alternate_link in self.alternates.get(link, ()):
+                    if alternate_source != source:
+                        alternates.setdefault(alternate_source, alternate_link)
+                article["alternates"] = [
+                    {"source": alternate_source, "link": alternate_link}
+                    for alternate_source, alternate_link in alternates.items()
+                ]
+                items[link] = article
+            return items[link]
+
+        latest = [item(entry) for entry in sorted(self.latest, reverse=True)]
+        top_story = latest[0] if latest else None
+        top_link = top_story["link"] if top_story else None
+
+        sources = {}
+        for source in sorted(self.by_source):
+            chosen = [
+                entry
+                for entry in sorted(self.by_source[source], reverse=True)
+                if entry[1] != top_link
+            ][:self.per_source]
+            if chosen:
+                sources[source] = [item(entry) for entry in chosen]
+        return latest, top_story, sources
+
+# ============================================================
+# END ARTICLE STORE
+# ============================================================
+
+
+# ============================================================
+# PIPELINE STAGES — FETCH / PARSE / RANK
+# ============================================================
+
+# ⏱️ Allow articles from the past 48 hours
+ARTICLE_WINDOW_HOURS = 48
+HEADLINES_PER_SOURCE = 8
+SUMMARY_HEADLINE_LIMIT = 80
+
+
+def fetch_stage(feed_cache):
+    """
+    Download every feed that is due for a poll (conditional GET). Returns
+    (source, result) pairs; feeds not yet due keep their stored articles.
+    """
+    now = datetime.now(timezone.utc)
+    due_feeds = {
+        source: url
+        for source, url in feeds.items()
+        if feed_is_due(feed_cache.get(url), now)
+    }
+    skipped = len(feeds) - len(due_feeds)
+    if skipped:
+        METRICS.count("feeds_skipped", skipped)
+        print(f"ℹ️ Polling {len(due_feeds)} feeds; {skipped} not due yet.")
+    return fetch_all_feeds(due_feeds, feed_cache)
+
+
+def parse_stage(fetch_results, feed_cache, article_store, cutoff):
+    """
+    Parse fetched feeds (or reuse cached entries on 304), store new articles
+    and save the feed cache. Returns the number of newly stored articles.
+    """
+    new_article_count = 0
+
+    for source, result in fetch_results:
+        if result is None:
+            continue
+
+        url = feeds[source]
+        cached = feed_cache.setdefault(url, {})
+        if result["status"] == 304:
+            # Unchanged since the last run: reuse the cached entries as-is.
+            entries = deserialize_feed_entries(cached.get("entries"), cutoff)
+            cached["not_modified_streak"] = cached.get("not_modified_streak", 0) + 1
+        else:
+            with METRICS.stage("feed_parse", source=source):
+                parsed = parse_feed(result["body"], cutoff)
+            entries = parsed["entries"]
+            serialized = serialize_feed_entries(entries)
+
+            # A 200 with the same entries is as quiet as a 304.
+            if serialized == cached.get("entries"):
+                cached["not_modified_streak"] = cached.get("not_modified_streak", 0) + 1
+            else:
+                cached["not_modified_streak"] = 0
+
+            cached.update({
+                "etag": result["etag"],
+                "modified": result["modified"],
+                "entries": serialized,
+                "publish_gap": estimate_publish_gap(parsed["published"]),
+                "poll_hint": parsed["poll_hint"],
+            })
+
+        schedule_next_poll(cached)
+        new_article_count += store_articles(article_store, source, entries)
+
+    METRICS.count("articles_new", new_article_count)
+
+    prune_cluster_buckets(article_store, cutoff - timedelta(hours=CLUSTER_WINDOW_HOURS))
+    article_store.commit()
+    print(f"ℹ️ Stored {new_article_count} new articles.")
+
+    try:
+        save_feed_cache(feed_cache)
+    except OSError as error:
+        print(f"⚠️ Feed cache not saved: {error}")
+
+    return new_article_count
+
+
+def rank_stage(article_store, cutoff):
+    """
+    Stream the article window through a HeadlineSelector. Returns
+    (latest, top_story, sources): the newest headlines for the summary, the
+    single newest story, and up to HEADLINES_PER_SOURCE per source with the
+    top story excluded.
+    """
+    selector = HeadlineSelector(
+        per_source=HEADLINES_PER_SOURCE,
+        overall=SUMMARY_HEADLINE_LIMIT,
+    )
+    selector.extend(iter_window_articles(article_store, cutoff))
+    return selector.result()
+
+# ============================================================
+# END PIPELINE STAGES — FETCH / PARSE / RANK
+# ============================================================
 
-# SORT + SELECT
-latest = sorted(all_items, key=lambda x: x["timestamp"], reverse=True)
-top_story = latest[0] if latest else None
-remaining = latest[1:] if len(latest) > 1 else []
 
 # ============================================================
 # AI DAILY SUMMARY — GEMINI
@@ -675,6 +2776,7 @@ remaining = latest[1:] if len(latest) > 1 else []
 
 SUMMARY_CACHE_FILE = "daily_summary.json"
 SUMMARY_MODEL = "gemini-3.6-flash"
+SUMMARY_TIMEOUT = 90  # seconds; also cut down to the run budget
 
 def load_summary_cache():
     """Load the most recently saved daily summary."""
@@ -707,6 +2809,7 @@ def save_summary_cache(summary_date, summary_text, article_count):
     os.replace(temporary_file, SUMMARY_CACHE_FILE)
 
 
+@recordable("summary", lambda items: "daily-summary", host="gemini")
 def generate_daily_summary(items):
     """Generate a briefing using the most recent collected headlines."""
     api_key = os.environ.get("GEMINI_API_KEY")
@@ -720,8 +2823,14 @@ def generate_daily_summary(items):
     headline_lines = []
 
     for number, item in enumerate(selected_items, start=1):
+        # Near-duplicates are already folded into one item; the other
+        # outlets are named so the model can weigh widely covered stories.
+        sources = item["source"]
+        alternates = item.get("alternates")
+        if alternates:
+            sources += "; also " + ", ".join(alternate["source"] for alternate in alternates)
         headline_lines.append(
-            f'{number}. [{item["source"]}] {item["title"]}'
+            f'{number}. [{sources}] {item["title"]}'
         )
 
     headline_text = "\n".join(headline_lines)
@@ -755,7 +2864,12 @@ Collected headlines:
 {headline_text}
 """.strip()
 
-    client = genai.Client(api_key=api_key)
+    from google import genai
+
+    client = genai.Client(
+        api_key=api_key,
+        http_options={"timeout": int(RUN_BUDGET.timeout(SUMMARY_TIMEOUT) * 1000)},
+    )
 
     response = client.models.generate_content(
         model=SUMMARY_MODEL,
@@ -778,11 +2892,6 @@ def build_summary_html(summary_text, summary_date):
         if paragraph.strip()
     ]
     
-    paragraphs_html = "\n".join(
-        f'<p style="margin:0;">{html_lib.escape(paragraph)}</p>'
-        for paragraph in paragraphs
-    )
-
     try:
         displayed_date = datetime.strptime(
             summary_date,
@@ -791,7 +2900,77 @@ def build_summary_html(summary_text, summary_date):
     except ValueError:
         displayed_date = summary_date
 
-    return f'''
+    return get_template("summary.html").render(
+        displayed_date=displayed_date,
+        paragraphs=[html_lib.escape(paragraph) for paragraph in paragraphs],
+    )
+
+
+def summarize_stage(latest):
+    """
+    Return today's summary section HTML. Gemini is called only when today's
+    summary is not already cached; on failure the last cached one is used.
+    """
+    today_utc = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    summary_cache = {} if fixtures_active() else load_summary_cache()
+
+    cached_date = summary_cache.get("date")
+    cached_summary = summary_cache.get("summary", "").strip()
+    # A missing key is a configuration problem, not a failing source.
+    has_api_key = bool(os.environ.get("GEMINI_API_KEY")) or FIXTURES["mode"] == "replay"
+
+    if cached_date != today_utc and latest and not has_api_key:
+        print("⚠️ Gemini summary skipped: GEMINI_API_KEY is missing.")
+
+    elif cached_date != today_utc and latest and BREAKERS.allow("gemini"):
+        try:
+            with METRICS.stage("gemini_summary", host="gemini"):
+                new_summary, summarized_article_count = generate_daily_summary(latest)
+            BREAKERS.success("gemini")
+
+            save_summary_cache(
+                today_utc,
+                new_summary,
+                summarized_article_count
+            )
+
+            cached_date = today_utc
+            cached_summary = new_summary
+
+            print(
+                f"✅ Gemini summary generated from "
+                f"{summarized_article_count} headlines."
+            )
+
+        except RunBudgetExceeded as error:
+            print(f"⚠️ Gemini summary skipped at the run deadline: {error}")
+
+        except Exception as error:
+            # This does not stop the normal headline update.
+            BREAKERS.failure("gemini")
+            print(f"⚠️ Gemini summary skipped: {error}")
+
+    elif cached_date == today_utc:
+        print("ℹ️ Today's Gemini summary already exists. Reusing it.")
+
+    if not cached_summary:
+        return ""
+    return build_summary_html(cached_summary, cached_date)
+
+# ============================================================
+# END AI DAILY SUMMARY
+# ============================================================
+
+# ============================================================
+# PIPELINE STAGE — RENDER
+# ============================================================
+
+# Page fragments as jinja2 templates. Values are passed in exactly as the
+# page shows them (SAM fields and summary paragraphs are escaped before
+# rendering), so autoescaping stays off and the markup is byte-for-byte what
+# the hand-built strings produced.
+RENDER_TEMPLATES = {
+    "summary.html": '''
 <section style="
     max-width:900px;
     margin:30px auto;
@@ -820,7 +2999,7 @@ Today in Space
     color:#777;
     margin-bottom:18px;
 ">
-{displayed_date}
+{{ displayed_date }}
 </div>
 
 <div style="
@@ -829,7 +3008,8 @@ Today in Space
     font-size:17px;
     color:#222;
 ">
-{paragraphs_html}
+{% for paragraph in paragraphs %}{% if not loop.first %}
+{% endif %}<p style="margin:0;">{{ paragraph }}</p>{% endfor %}
 </div>
 
 <hr style="margin:20px 0;">
@@ -842,132 +3022,53 @@ AI-generated summary of today's collected headlines. Read the original articles
 </div>
 
 </section>
-'''
-
-
-today_utc = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-summary_cache = load_summary_cache()
-
-cached_date = summary_cache.get("date")
-cached_summary = summary_cache.get("summary", "").strip()
-
-# Gemini is called only when today's summary is not already cached.
-if cached_date != today_utc and latest:
-    try:
-        new_summary, summarized_article_count = generate_daily_summary(latest)
-
-        save_summary_cache(
-            today_utc,
-            new_summary,
-            summarized_article_count
-        )
-
-        cached_date = today_utc
-        cached_summary = new_summary
-
-        print(
-            f"✅ Gemini summary generated from "
-            f"{summarized_article_count} headlines."
-        )
-
-    except Exception as error:
-        # This does not stop the normal headline update.
-        print(f"⚠️ Gemini summary skipped: {error}")
-
-elif cached_date == today_utc:
-    print("ℹ️ Today's Gemini summary already exists. Reusing it.")
-
-
-daily_summary_html = ""
-
-if cached_summary:
-    daily_summary_html = build_summary_html(
-        cached_summary,
-        cached_date
-    )
-
-# ============================================================
-# END AI DAILY SUMMARY
-# ============================================================
-
-# ORGANIZE BY SOURCE
-sources = {}
-for item in remaining:
-    sources.setdefault(item["source"], []).append(item)
-
-# 🔁 Top image (already selected by picker)
-fallback_image = IMAGE_MAP["default"]
-image_url = top_story["image"] if (top_story and top_story["image"]) else fallback_image
-
-# ⏱️ Recent class = < 2 hours
-is_recent = (datetime.now(timezone.utc) - top_story["timestamp"]).total_seconds() < 7200 if top_story else False
-top_class = "recent" if is_recent else ""
-
-# 📌 Top Story Block
-top_html = ""
-if top_story:
-    top_html = f'''
-<div class="top-story {top_class}" style="text-align: center;">
-  <a href="{top_story["link"]}" target="_blank" style="display: inline-block;">
-    <img src="{image_url}" alt="Top image"
+''',
+    "top_story.html": '''
+<div class="top-story" style="text-align: center;">
+  <a href="{{ link }}" target="_blank" style="display: inline-block;">
+    <img src="{{ image_url }}" alt="Top image"
          style="display: block; max-width: 720px; width: 100%; height: auto; max-height: 300px; object-fit: cover; border-radius: 6px;">
   </a>
   <div style="margin-top: 0.5rem;">
-    <a href="{top_story["link"]}" target="_blank" style="text-decoration: none;">
-      {top_story["title"]}
+    <a href="{{ link }}" target="_blank" style="text-decoration: none;">
+      {{ title }}
     </a>
   </div>
-  <div class="source">{top_story["source"]} – {top_story["age"]}</div>
+  <div class="source">{{ source }} – {{ age_html }}{% if alternates %}
+    <span class="also">Also: {% for alternate_source, alternate_link in alternates %}{% if not loop.first %}, {% endif %}<a href="{{ alternate_link }}" target="_blank">{{ alternate_source }}</a>{% endfor %}</span>{% endif %}</div>
 </div>
-'''
-
-# NEW: fetch upcoming launches (safe fail)
-try:
-    upcoming_launches = fetch_upcoming_launches(
-        limit=8,
-        days_ahead=7
-    )
-except Exception as error:
-    print(f"⚠️ Upcoming launches skipped: {error}")
-    upcoming_launches = []
-
-
-# NEW: fetch SAM.gov space opportunities
-sam_opportunities = get_sam_opportunities(limit=8)
-
-# 📚 Section Columns
-sections = ['<div class="columns">']
-for source in feeds.keys():
-    if source in sources:
-        source_url = source_links.get(source, "#")
-        section_html = f'<div class="column"><div class="section"><h2><a href="{source_url}" target="_blank">{source}</a></h2>'
-        for a in sources[source][:8]:
-            is_recent = (datetime.now(timezone.utc) - a["timestamp"]).total_seconds() < 7200
-            recent_class = "recent" if is_recent else ""
-            section_html += f'''
-            <div class="headline {recent_class}">
-              <a href="{a["link"]}" target="_blank">{a["title"]}</a>
-              <span>({a["age"]})</span>
+''',
+    "source_column.html": (
+        '<div class="column"><div class="section"><h2><a href="{{ source_url }}" target="_blank">{{ source }}</a></h2>'
+        '''{% for link, title, _, age_html, alternates in items %}
+            <div class="headline">
+              <a href="{{ link }}" target="_blank">{{ title }}</a>
+              {{ age_html }}{% if alternates %}
+              <span class="also">Also: {% for alternate_source, alternate_link in alternates %}{% if not loop.first %}, {% endif %}<a href="{{ alternate_link }}" target="_blank">{{ alternate_source }}</a>{% endfor %}</span>{% endif %}
             </div>
-            '''
-        section_html += '</div></div>'
-        sections.append(section_html)
-
-# NEW: Append right-most column for Upcoming Launches
-if upcoming_launches:
-    rows = []
+            {% endfor %}'''
+        '</div></div>'
+    ),
+    "launches_column.html": '''
+    <div class="column">
+      <div class="section">
+        <h2>
+          <a href="https://thespacedevs.com/"
+             target="_blank"
+             rel="noopener noreferrer">
+            Upcoming Launches (next 7 days)
+          </a>
+        </h2>
 
-    for l in upcoming_launches:
-        rows.append(f'''
+        {% for launch in launches %}
         <div class="headline">
-          <strong>{l["when"]}</strong> — {l["name"]}
+          <strong>{{ launch["when"] }}</strong> — {{ launch["name"] }}
           <div class="source" style="margin-top:2px;">
-            {l["provider"]} • {l["pad"]}{(" — " + l["loc"]) if l["loc"] else ""}
+            {{ launch["provider"] }} • {{ launch["pad"] }}{% if launch["loc"] %} — {{ launch["loc"] }}{% endif %}
           </div>
         </div>
-        ''')
-
-    credit = '''
+        {% endfor %}
+        
     <div class="source" style="margin-top:6px;">
       Data:
       <a href="https://thespacedevs.com/"
@@ -976,185 +3077,373 @@ if upcoming_launches:
         Launch Library 2 (The Space Devs)
       </a>
     </div>
-    '''
-
-    launches_column_html = f'''
+    
+      </div>
+    </div>
+    ''',
+    "sam_column.html": '''
     <div class="column">
       <div class="section">
         <h2>
-          <a href="https://thespacedevs.com/"
+          <a href="https://sam.gov/search/?index=opp"
              target="_blank"
              rel="noopener noreferrer">
-            Upcoming Launches (next 7 days)
+            Space Acquisition Watch
           </a>
         </h2>
 
-        {''.join(rows)}
-        {credit}
+        {% for row in rows %}
+        <div class="headline">
+          <a href="{{ row["link"] }}"
+             target="_blank"
+             rel="noopener noreferrer">
+            {{ row["title"] }}
+          </a>
+          <span>({{ row["metadata"] | join(" • ") }})</span>
+        </div>
+        {% endfor %}
+        
+    <div class="source" style="margin-top:8px;">
+      Source:
+      <a href="https://sam.gov/search/?index=opp"
+         target="_blank"
+         rel="noopener noreferrer">
+        SAM.gov
+      </a>.
+      Verify all requirements and deadlines in the official notice.
+    </div>
+    
       </div>
     </div>
-    '''
+    ''',
+}
 
-    sections.append(launches_column_html)
+_COMPILED_TEMPLATES = {}
 
-# NEW: Append Space Acquisition Watch column
-if sam_opportunities:
-    sam_rows = []
 
-    for opportunity in sam_opportunities:
-        safe_title = html_lib.escape(
-            opportunity.get("title") or "Untitled opportunity"
-        )
+def get_template(name):
+    """
+    Compiled template by name. jinja2 is imported and every template compiled
+    once, on the first render, so importing update.py stays cheap.
+    """
+    if not _COMPILED_TEMPLATES:
+        from jinja2 import DictLoader, Environment
 
-        short_agency = format_sam_agency(
-            opportunity.get("agency")
+        environment = Environment(
+            loader=DictLoader(RENDER_TEMPLATES),
+            autoescape=False,
+            keep_trailing_newline=True,
         )
+        # The templates use no jinja globals (range, dict, cycler, ...), and
+        # Template.render() merges every global into each render's context,
+        # which is a large part of rendering a small fragment.
+        environment.globals.clear()
+        _COMPILED_TEMPLATES.update(
+            (template_name, environment.get_template(template_name))
+            for template_name in RENDER_TEMPLATES
+        )
+    return _COMPILED_TEMPLATES[name]
 
-        safe_agency = html_lib.escape(short_agency)
 
-        safe_notice_type = html_lib.escape(
-            opportunity.get("notice_type") or "Opportunity"
-        )
+# ---------- fragment cache ----------
+# Each rendered fragment is stored with a hash of its template and inputs.
+# A column whose headlines did not change since the previous run is reused
+# as-is instead of being rendered again.
+FRAGMENT_CACHE_FILE = "fragment_cache.json"
+
+
+def load_fragment_cache():
+    """Load the fragments rendered by the previous run, keyed by slot."""
+    try:
+        with open(FRAGMENT_CACHE_FILE, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            return data
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        pass
+    return {}
+
+
+def save_fragment_cache(cache):
+    """Save rendered fragments for the next run."""
+    temporary_file = FRAGMENT_CACHE_FILE + ".tmp"
+    with open(temporary_file, "w", encoding="utf-8") as file:
+        json.dump(cache, file, ensure_ascii=False, sort_keys=True)
+    os.replace(temporary_file, FRAGMENT_CACHE_FILE)
+
+
+@functools.lru_cache(maxsize=None)
+def template_digest(name):
+    """Hash of a template's source, so editing a template invalidates its fragments."""
+    return hashlib.sha1(RENDER_TEMPLATES[name].encode("utf-8")).hexdigest()
+
+
+def fragment_key(name, inputs):
+    """Hash of a template and the raw inputs one fragment is rendered from."""
+    payload = template_digest(name) + repr(inputs)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def render_fragment(name, make_context, make_inputs, slot=None, cache=None):
+    """
+    Render one template with the context returned by make_context(). With a
+    cache, the fragment stored under slot is reused when the key of
+    make_inputs() matches, and make_context is not called at all; a fresh
+    render is stored otherwise. Without a cache make_inputs is not called.
+    The inputs should be plain strings, numbers and tuples.
+    """
+    if cache is None:
+        return get_template(name).render(make_context())
+
+    key = fragment_key(name, make_inputs())
+    cached = cache.get(slot)
+    if isinstance(cached, dict) and cached.get("key") == key:
+        METRICS.count("fragment_hits")
+        return cached["html"]
+
+    METRICS.count("fragment_renders")
+    html = get_template(name).render(make_context())
+    cache[slot] = {"key": key, "html": html}
+    return html
+
+
+MONTH_ABBREVIATIONS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def build_age_html(timestamp, parenthesized=False):
+    """
+    Age placeholder for the page script. The server renders a fixed UTC time
+    and the ISO timestamp; "about 5m ago" and the "recent" highlight are
+    computed in the browser, so the block only changes when headlines do.
+    """
+    # Same text as strftime("%b %d, %H:%M UTC"), which is several times slower.
+    label = (
+        f"{MONTH_ABBREVIATIONS[timestamp.month - 1]} {timestamp.day:02d}, "
+        f"{timestamp.hour:02d}:{timestamp.minute:02d} UTC"
+    )
+    if parenthesized:
+        label = f"({label})"
+    return f'<span class="age" data-published="{timestamp.isoformat()}">{label}</span>'
+
+
+def headline_context(item, parenthesized=False):
+    """
+    (link, title, source, age_html, alternates) of a headline item, with
+    alternates as (source, link) pairs. The templates unpack these tuples
+    into loop variables, which is much cheaper than a lookup per field.
+    """
+    return (
+        item["link"],
+        item["title"],
+        item["source"],
+        build_age_html(item["timestamp"], parenthesized),
+        [(alternate["source"], alternate["link"]) for alternate in item.get("alternates") or ()],
+    )
+
+
+def headline_inputs(item):
+    """The fields of a headline item that its rendered HTML depends on."""
+    return (
+        item["link"],
+        item["title"],
+        item["source"],
+        item["timestamp"].timestamp(),
+        tuple((alternate["source"], alternate["link"]) for alternate in item.get("alternates") or ()),
+    )
+
+
+def build_top_story_html(top_story, cache=None):
+    """📌 Top Story Block."""
+    if not top_story:
+        return ""
+
+    # 🔁 Top image (already selected by picker)
+    fallback_image = IMAGE_MAP["default"]
+    image_url = top_story["image"] if top_story["image"] else fallback_image
+
+    # ⏱️ Age and the < 2 hours "recent" class are filled in by the page script.
+    return render_fragment(
+        "top_story.html",
+        lambda: dict(
+            zip(("link", "title", "source", "age_html", "alternates"), headline_context(top_story)),
+            image_url=image_url,
+        ),
+        lambda: (headline_inputs(top_story), image_url),
+        "top_story",
+        cache,
+    )
+
+
+def build_source_column_html(source, items, cache=None):
+    """📚 One source column with its newest headlines."""
+    items = items[:HEADLINES_PER_SOURCE]
+    source_url = source_links.get(source, "#")
+    return render_fragment(
+        "source_column.html",
+        lambda: {
+            "source": source,
+            "source_url": source_url,
+            "items": [headline_context(item, parenthesized=True) for item in items],
+        },
+        lambda: (source, source_url, tuple(headline_inputs(item) for item in items)),
+        f"source:{source}",
+        cache,
+    )
+
+
+LAUNCH_FIELDS = ("when", "name", "provider", "pad", "loc")
+
+
+def build_launches_column_html(upcoming_launches, cache=None):
+    """Right-most column for Upcoming Launches."""
+    return render_fragment(
+        "launches_column.html",
+        lambda: {"launches": upcoming_launches},
+        lambda: tuple(tuple(launch[field] for field in LAUNCH_FIELDS) for launch in upcoming_launches),
+        "launches",
+        cache,
+    )
+
+
+SAM_RENDERED_FIELDS = (
+    "title", "agency", "notice_type", "link", "response_deadline", "solicitation_number",
+)
+
+
+def sam_row_context(opportunity):
+    """Escaped fields for one Space Acquisition Watch row."""
+    safe_title = html_lib.escape(
+        opportunity.get("title") or "Untitled opportunity"
+    )
 
-        safe_link = html_lib.escape(
-            opportunity.get("link")
-            or "https://sam.gov/search/?index=opp",
-            quote=True,
+    short_agency = format_sam_agency(
+        opportunity.get("agency")
+    )
+
+    safe_agency = html_lib.escape(short_agency)
+
+    safe_notice_type = html_lib.escape(
+        opportunity.get("notice_type") or "Opportunity"
+    )
+
+    safe_link = html_lib.escape(
+        opportunity.get("link")
+        or "https://sam.gov/search/?index=opp",
+        quote=True,
+    )
+
+    safe_deadline = html_lib.escape(
+        format_sam_date(
+            opportunity.get("response_deadline")
         )
+    )
+
+    solicitation_number = opportunity.get(
+        "solicitation_number"
+    )
 
-        safe_deadline = html_lib.escape(
-            format_sam_date(
-                opportunity.get("response_deadline")
+    metadata_parts = [
+        safe_agency,
+        safe_notice_type,
+        f"Due: {safe_deadline}",
+    ]
+
+    if solicitation_number:
+        metadata_parts.append(
+            "Solicitation: "
+            + html_lib.escape(
+                str(solicitation_number)
             )
         )
 
-        solicitation_number = opportunity.get(
-            "solicitation_number"
-        )
+    return {
+        "link": safe_link,
+        "title": safe_title,
+        "metadata": metadata_parts,
+    }
 
-        metadata_parts = [
-            safe_agency,
-            safe_notice_type,
-            f"Due: {safe_deadline}",
-        ]
-
-        if solicitation_number:
-            metadata_parts.append(
-                "Solicitation: "
-                + html_lib.escape(
-                    str(solicitation_number)
-                )
-            )
 
-        metadata_html = " • ".join(metadata_parts)
+def build_sam_column_html(sam_opportunities, cache=None):
+    """Space Acquisition Watch column."""
+    return render_fragment(
+        "sam_column.html",
+        lambda: {"rows": [sam_row_context(opportunity) for opportunity in sam_opportunities]},
+        lambda: tuple(
+            tuple(str(opportunity.get(field)) for field in SAM_RENDERED_FIELDS)
+            for opportunity in sam_opportunities
+        ),
+        "sam",
+        cache,
+    )
 
-        sam_rows.append(f'''
-        <div class="headline">
-          <a href="{safe_link}"
-             target="_blank"
-             rel="noopener noreferrer">
-            {safe_title}
-          </a>
-          <span>({metadata_html})</span>
-        </div>
-        ''')
 
-    sam_credit = '''
-    <div class="source" style="margin-top:8px;">
-      Source:
-      <a href="https://sam.gov/search/?index=opp"
-         target="_blank"
-         rel="noopener noreferrer">
-        SAM.gov
-      </a>.
-      Verify all requirements and deadlines in the official notice.
-    </div>
-    '''
+def render_stage(daily_summary_html, top_story, sources, upcoming_launches, sam_opportunities, fragments=None):
+    """
+    Build the full block that goes between the HEADLINES markers. Fragments
+    are appended to one buffer and joined once. Pass the dict from
+    load_fragment_cache() as fragments to reuse unchanged columns; slots
+    that are no longer on the page are dropped from it.
+    """
+    buffer = [
+        '<!-- START HEADLINES -->\n',
+        daily_summary_html,
+        '\n',
+        build_top_story_html(top_story, fragments),
+        '<div class="columns">',
+    ]
+    for source in feeds.keys():
+        if source in sources:
+            buffer.append('\n')
+            buffer.append(build_source_column_html(source, sources[source], fragments))
 
-    sam_column_html = f'''
-    <div class="column">
-      <div class="section">
-        <h2>
-          <a href="https://sam.gov/search/?index=opp"
-             target="_blank"
-             rel="noopener noreferrer">
-            Space Acquisition Watch
-          </a>
-        </h2>
+    if upcoming_launches:
+        buffer.append('\n')
+        buffer.append(build_launches_column_html(upcoming_launches, fragments))
 
-        {''.join(sam_rows)}
-        {sam_credit}
-      </div>
-    </div>
-    '''
+    if sam_opportunities:
+        buffer.append('\n')
+        buffer.append(build_sam_column_html(sam_opportunities, fragments))
+
+    buffer.append('\n</div>')
+    buffer.append('\n<!-- END HEADLINES -->')
+
+    if fragments is not None:
+        used = {"top_story", "launches", "sam"} | {f"source:{source}" for source in sources}
+        for slot in [slot for slot in fragments if slot not in used]:
+            del fragments[slot]
 
-    sections.append(sam_column_html)
+    return "".join(buffer)
 
-sections.append('</div>')
+# ============================================================
+# END PIPELINE STAGE — RENDER
+# ============================================================
 
-# 🔧 Inject into index.html
-with open("index.html", "r", encoding="utf-8") as f:
-    html = f.read()
 
-# --- Safe SEO title + description insert (invisible to visitors) ---
+# ============================================================
+# PIPELINE STAGE — WRITE
+# Injects the rendered block into index.html and keeps the
+# head (title, GA, SEO) in place.
+# ============================================================
 
-import re
+INDEX_FILE = "index.html"
+START_MARKER = "<!-- START HEADLINES -->"
+END_MARKER = "<!-- END HEADLINES -->"
 
-# 1️⃣ Set tab title
-title_text = "Space Headlines: Breaking Space News, NASA, Space Force & Launches"
-
-# Ensure <head> exists
-if "</head>" not in html:
-    html = "<head>\n</head>\n" + html
-
-# Replace existing <title> or insert new one before </head>
-if re.search(r"<title\b[^>]*>.*?</title>", html, flags=re.I | re.S):
-    html = re.sub(
-        r"<title\b[^>]*>.*?</title>",
-        f"<title>{title_text}</title>",
-        html,
-        count=1,
-        flags=re.I | re.S
-    )
-else:
-    html = html.replace("</head>", f"<title>{title_text}</title>\n</head>", 1)
+# 1️⃣ Tab title
+TITLE_TEXT = "Space Headlines: Breaking Space News, NASA, Space Force & Launches"
 
-# 2️⃣ Add meta description if missing
-meta_desc = (
+# 2️⃣ Meta description (only added if missing)
+META_DESCRIPTION = (
     "Space Headlines delivers real-time space news, NASA and Space Force updates, rocket launches, satellites, "
     "astronomy, and commercial space stories — refreshed every 5 minutes."
 )
-if '<meta name="description"' not in html:
-    html = html.replace(
-        "</head>",
-        f'<meta name="description" content="{meta_desc}">\n</head>',
-        1
-    )
-
-# --- end SEO insert ---
 
 
 # ---------------- SAFE HEAD + GA + SEO (NON-DESTRUCTIVE) ----------------
-def _ensure_head(doc: str) -> str:
-    """Guarantee a <head>...</head> exists so inserts never leak into visible body."""
-    if "</head>" in doc:
-        return doc
-    # If a <head ...> exists but not closed, close it before <body> or at end
-    if "<head" in doc and "</head>" not in doc:
-        body_i = doc.find("<body")
-        return (doc[:body_i] + "</head>\n" + doc[body_i:]) if body_i != -1 else (doc + "\n</head>")
-    # No head at all: create it before <body> or prepend
-    body_i = doc.find("<body")
-    head_block = "<head>\n</head>\n"
-    return (doc[:body_i] + head_block + doc[body_i:]) if body_i != -1 else (head_block + doc)
-
-def _has_tag(doc: str, pattern: str) -> bool:
-    return re.search(pattern, doc, flags=re.I | re.S) is not None
-
-def _insert_before_head_close(doc: str, block: str) -> str:
-    return doc.replace("</head>", block + "\n</head>", 1)
-
-html = _ensure_head(html)
+# index.html is scanned once by HEAD_TOKEN_PATTERN. The scan records which
+# head tags are present, where <title> and </head> are, and where the
+# HEADLINES markers are. Every edit is then spliced in with a single join.
+# A tag is only added when missing, so existing tags are never duplicated.
 
 # --- GA (add once, head-only) ---
 GA_ID = "G-F0ZJXSLFMH"
@@ -1168,93 +3457,701 @@ ga_snippet = f"""
   gtag('config', '{GA_ID}');
 </script>
 """
-if GA_ID not in html:
-    html = _insert_before_head_close(html, ga_snippet)
 # --- end GA ---
 
-# --- SEO (non-destructive: only add if missing; never duplicates) ---
-def ensure_seo_non_destructive(doc: str) -> str:
-    site_url = "https://spaceheadlines.com/"
-    title_text = "Space Headlines: Breaking Space News, NASA, Space Force & Launches"
-    description = (
-        "Space news aggregator with upcoming launches, Space Force & NASA updates, "
-        "rockets, satellites, astronomy, commercial space—refreshed every 5 minutes."
-    )[:158]
-    og_image = site_url.rstrip("/") + "/images/HeadlineLogo.png"
-
-    # 1) title
-    if not _has_tag(doc, r"<title\b[^>]*>.*?</title>"):
-        doc = _insert_before_head_close(doc, f"<title>{title_text}</title>")
-
-    # 2) meta description
-    if not _has_tag(doc, r'<meta\s+name=["\']description["\']'):
-        doc = _insert_before_head_close(doc, f'<meta name="description" content="{description}" />')
-
-    # 2.5) google site verification
-    if not _has_tag(doc, r'<meta\s+name=["\']google-site-verification["\']'):
-        doc = _insert_before_head_close(
-            doc,
-            '<meta name="google-site-verification" content="p8rg-XOJM-gk3dIX2qP7DyD_ouNpPLKp933vq11RdME" />'
+SITE_URL = "https://spaceheadlines.com/"
+SEO_DESCRIPTION = (
+    "Space news aggregator with upcoming launches, Space Force & NASA updates, "
+    "rockets, satellites, astronomy, commercial space—refreshed every 5 minutes."
+)[:158]
+OG_IMAGE = SITE_URL.rstrip("/") + "/images/HeadlineLogo.png"
+
+JSON_LD = {
+    "@context": "https://schema.org",
+    "@type": "WebSite",
+    "name": "Space Headlines",
+    "alternateName": ["SpaceHeadlines", "spaceheadlines.com"],
+    "url": SITE_URL,
+    "potentialAction": {
+        "@type": "SearchAction",
+        "target": SITE_URL + "?q={search_term_string}",
+        "query-input": "required name=search_term_string"
+    }
+}
+
+# Head tags added before </head> when missing, in this order:
+# (token kinds that mean the tag is already present, snippet to add).
+HEAD_TAGS = [
+    (("description",), f'<meta name="description" content="{META_DESCRIPTION}">'),
+    (("ga",), ga_snippet),
+    (
+        ("verification",),
+        '<meta name="google-site-verification" content="p8rg-XOJM-gk3dIX2qP7DyD_ouNpPLKp933vq11RdME" />',
+    ),
+    (("canonical",), f'<link rel="canonical" href="{SITE_URL}" />'),
+    (
+        ("robots",),
+        '<meta name="robots" content="index,follow,max-snippet:-1,max-image-preview:large,max-video-preview:-1" />',
+    ),
+    # OG/Twitter: the block is added once, only if neither kind is present.
+    (("og", "twitter"), "\n".join([
+        '<meta property="og:type" content="website" />',
+        '<meta property="og:site_name" content="Space Headlines" />',
+        f'<meta property="og:title" content="{TITLE_TEXT}" />',
+        f'<meta property="og:description" content="{SEO_DESCRIPTION}" />',
+        f'<meta property="og:url" content="{SITE_URL}" />',
+        f'<meta property="og:image" content="{OG_IMAGE}" />',
+        '<meta name="twitter:card" content="summary_large_image" />',
+        f'<meta name="twitter:title" content="{TITLE_TEXT}" />',
+        f'<meta name="twitter:description" content="{SEO_DESCRIPTION}" />',
+        f'<meta name="twitter:image" content="{OG_IMAGE}" />',
+    ])),
+    (
+        ("json_ld",),
+        '<script type="application/ld+json">' + json.dumps(JSON_LD, ensure_ascii=False) + "</script>",
+    ),
+]
+
+# Tokens are matched only where a tag starts, so the scan jumps from one "<"
+# to the next instead of trying every pattern at every character.
+HEAD_TOKEN_PATTERN = re.compile(
+    "<(?:" + "|".join([
+        r"(?P<title>title\b[^>]*>.*?</title>)",
+        r"(?P<head_close>/head>)",
+        r"(?P<start>" + re.escape(START_MARKER[1:]) + r")",
+        r"""(?P<description>meta\s+name=["']description["'])""",
+        r"""(?P<verification>meta\s+name=["']google-site-verification["'])""",
+        r"""(?P<canonical>link\s+rel=["']canonical["'])""",
+        r"""(?P<robots>meta\s+name=["']robots["'])""",
+        r"""(?P<og>meta\s+property=["']og:)""",
+        r"""(?P<twitter>meta\s+name=["']twitter:)""",
+        r"""(?P<json_ld>script\s+type=["']application/ld\+json["'])""",
+        r"(?P<ga>script\b[^>]*" + re.escape(GA_ID) + r")",
+    ]) + ")",
+    flags=re.I | re.S,
+)
+
+
+def scan_index_html(html):
+    """
+    One pass over the page. Returns {token kind: (start, end)} for the first
+    match of each kind. The headlines block is skipped with a single find,
+    so its contents never count as head tags.
+    """
+    tokens = {}
+    position = html.find("<")
+    while position != -1:
+        match = HEAD_TOKEN_PATTERN.match(html, position)
+        if match is None:
+            position = html.find("<", position + 1)
+            continue
+
+        kind = match.lastgroup
+        tokens.setdefault(kind, match.span())
+        position = match.end()
+
+        if kind == "start":
+            end = html.find(END_MARKER, position)
+            if end == -1:
+                break
+            tokens.setdefault("end", (end, end + len(END_MARKER)))
+            position = end + len(END_MARKER)
+
+        position = html.find("<", position)
+
+    return tokens
+
+
+def head_edits(html, tokens):
+    """
+    The (start, end, replacement) edits that bring the head up to date: the
+    title is set to TITLE_TEXT and every missing HEAD_TAGS entry is added
+    before </head>. A page without </head> gets a head at the top.
+    """
+    edits = []
+    inserts = []
+
+    title = f"<title>{TITLE_TEXT}</title>"
+    if "title" in tokens:
+        start, end = tokens["title"]
+        if html[start:end] != title:
+            edits.append((start, end, title))
+    else:
+        inserts.append(title + "\n")
+
+    for kinds, snippet in HEAD_TAGS:
+        if not any(kind in tokens for kind in kinds):
+            inserts.append(snippet + "\n")
+
+    if "head_close" in tokens:
+        if inserts:
+            position = tokens["head_close"][0]
+            edits.append((position, position, "".join(inserts)))
+    else:
+        edits.append((0, 0, "<head>\n" + "".join(inserts) + "</head>\n"))
+
+    return edits
+
+
+def splice_edits(html, edits):
+    """Apply non-overlapping (start, end, replacement) edits in one join."""
+    parts = []
+    cursor = 0
+    for start, end, replacement in sorted(edits, key=lambda edit: edit[0]):
+        parts.append(html[cursor:start])
+        parts.append(replacement)
+        cursor = end
+    parts.append(html[cursor:])
+    return "".join(parts)
+# ---------------- END SAFE HEAD + GA + SEO --------------------
+
+
+# Server-rendered relative ages from older runs; ignored by the fingerprint so
+# a page written before ages moved client-side is not rewritten just for them.
+VOLATILE_PATTERNS = [
+    (re.compile(r"about \d+[mhd] ago|just now"), ""),
+    (re.compile(r'class="(headline|top-story)(?: ?recent\s*|\s+)"'), r'class="\1"'),
+]
+
+
+def headlines_fingerprint(block):
+    """Hash of a headlines block with volatile fields normalized away."""
+    for pattern, replacement in VOLATILE_PATTERNS:
+        block = pattern.sub(replacement, block)
+    return hashlib.sha256(block.encode("utf-8")).hexdigest()
+
+
+def write_stage(new_content, path=INDEX_FILE):
+    """
+    🔧 Inject the rendered headlines block into index.html. The page is
+    scanned once, and the head edits and the new block are spliced in
+    together. The file is only rewritten when the block's fingerprint or
+    the head changed, so an unchanged run leaves nothing for the workflow to
+    commit. Returns True when the file was written.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        original_html = f.read()
+
+    tokens = scan_index_html(original_html)
+    edits = head_edits(original_html, tokens)
+
+    if "start" in tokens and "end" in tokens:
+        start = tokens["start"][0]
+        end = tokens["end"][1]
+        old_content = original_html[start:end]
+        if not edits and (
+            headlines_fingerprint(old_content) == headlines_fingerprint(new_content)
+        ):
+            print("ℹ️ Headlines unchanged; index.html not rewritten.")
+            return False
+
+        edits.append((start, end, new_content))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(splice_edits(original_html, edits))
+        print("✅ Headlines updated successfully.")
+    else:
+        # At least persist head updates so SEO/GA are kept even if markers are missing
+        if not edits:
+            print("❗ Injection markers not found. Head already up to date.")
+            return False
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(splice_edits(original_html, edits))
+        print("❗ Injection markers not found. Wrote head (SEO/GA) updates only.")
+    return True
+
+# ============================================================
+# END PIPELINE STAGE — WRITE
+# ============================================================
+
+# ============================================================
+# PIPELINE STAGE — JSON API
+# headlines.json, launches.json and sam.json carry the same data
+# the page is rendered from, for clients that would otherwise
+# scrape index.html. Keys are sorted and each file carries a hash
+# of its data; a file is only rewritten when that hash changes,
+# so its ETag stays put between runs that change nothing.
+# ============================================================
+
+API_VERSION = 1
+API_HEADLINES_FILE = "headlines.json"
+API_LAUNCHES_FILE = "launches.json"
+API_SAM_FILE = "sam.json"
+
+API_LAUNCH_FIELDS = ("name", "window_start", "provider", "pad", "loc")
+API_SAM_FIELDS = (
+    "notice_id", "title", "agency", "notice_type", "posted_date", "response_deadline",
+    "solicitation_number", "naics_code", "link",
+)
+
+
+def api_headline(item):
+    """Public fields of one headline; the relative age is left to clients."""
+    return {
+        "title": item["title"],
+        "link": item["link"],
+        "source": item["source"],
+        "published": item["timestamp"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "image": urljoin(SITE_URL, item["image"]),
+        "also": [dict(alternate) for alternate in item.get("alternates") or ()],
+    }
+
+
+def write_api_file(path, kind, data, now=None):
+    """
+    Write one versioned JSON document unless its data hash is unchanged.
+    Returns True when the file was written.
+    """
+    body = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    content_hash = hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            if json.load(file).get("hash") == content_hash:
+                return False
+    except (FileNotFoundError, json.JSONDecodeError, OSError, AttributeError):
+        pass
+
+    document = {
+        "version": API_VERSION,
+        "kind": kind,
+        "updated_at": (now or datetime.now(timezone.utc)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "hash": content_hash,
+        "data": data,
+    }
+    temporary_file = path + ".tmp"
+    with open(temporary_file, "w", encoding="utf-8") as file:
+        json.dump(document, file, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        file.write("\n")
+    os.replace(temporary_file, path)
+    return True
+
+
+def api_stage(top_story, sources, upcoming_launches, sam_opportunities):
+    """Write the JSON API files from the data just rendered into index.html."""
+    now = datetime.now(timezone.utc)
+    headlines = {
+        "top_story": api_headline(top_story) if top_story else None,
+        "sources": [
+            {
+                "source": source,
+                "homepage": source_links.get(source, ""),
+                "items": [api_headline(item) for item in items],
+            }
+            for source, items in sources.items()
+        ],
+    }
+    launches = [
+        {field: launch.get(field) for field in API_LAUNCH_FIELDS}
+        for launch in upcoming_launches
+    ]
+    sam = [
+        {field: opportunity.get(field) for field in API_SAM_FIELDS}
+        for opportunity in sam_opportunities
+    ]
+
+    written = [
+        path
+        for path, kind, data in (
+            (API_HEADLINES_FILE, "headlines", headlines),
+            (API_LAUNCHES_FILE, "launches", launches),
+            (API_SAM_FILE, "sam", sam),
         )
-    
-    # 3) canonical
-    if not _has_tag(doc, r'<link\s+rel=["\']canonical["\']'):
-        doc = _insert_before_head_close(doc, f'<link rel="canonical" href="{site_url}" />')
-
-    # 4) robots
-    if not _has_tag(doc, r'<meta\s+name=["\']robots["\']'):
-        doc = _insert_before_head_close(doc, '<meta name="robots" content="index,follow,max-snippet:-1,max-image-preview:large,max-video-preview:-1" />')
-
-    # 5) OG/Twitter (add block once if neither present)
-    has_og = _has_tag(doc, r'<meta\s+property=["\']og:')
-    has_tw = _has_tag(doc, r'<meta\s+name=["\']twitter:')
-    if not (has_og or has_tw):
-        og_tw_block = "\n".join([
-            '<meta property="og:type" content="website" />',
-            '<meta property="og:site_name" content="Space Headlines" />',
-            f'<meta property="og:title" content="{title_text}" />',
-            f'<meta property="og:description" content="{description}" />',
-            f'<meta property="og:url" content="{site_url}" />',
-            f'<meta property="og:image" content="{og_image}" />',
-            '<meta name="twitter:card" content="summary_large_image" />',
-            f'<meta name="twitter:title" content="{title_text}" />',
-            f'<meta name="twitter:description" content="{description}" />',
-            f'<meta name="twitter:image" content="{og_image}" />',
-        ])
-        doc = _insert_before_head_close(doc, og_tw_block)
-
-    # 6) JSON-LD (add once)
-    if not _has_tag(doc, r'<script\s+type=["\']application/ld\+json["\']'):
-        json_ld = {
-            "@context": "https://schema.org",
-            "@type": "WebSite",
-            "name": "Space Headlines",
-            "alternateName": ["SpaceHeadlines", "spaceheadlines.com"],
-            "url": site_url,
-            "potentialAction": {
-                "@type": "SearchAction",
-                "target": site_url + "?q={search_term_string}",
-                "query-input": "required name=search_term_string"
+        if write_api_file(path, kind, data, now)
+    ]
+    if written:
+        print(f"✅ JSON API updated: {', '.join(written)}.")
+    return written
+
+# ============================================================
+# END PIPELINE STAGE — JSON API
+# ============================================================
+
+# ============================================================
+# PIPELINE STAGE — SEARCH INDEX
+# A prebuilt inverted index over the titles and sources of the
+# last SEARCH_WINDOW_DAYS of the article store, written to
+# search/ for search.js to answer `?q=` queries in the browser.
+# Terms are sharded by first character so a query loads only the
+# shards of its own words, and article records are sharded by
+# rowid so older shards stay byte-identical between runs.
+# ============================================================
+
+SEARCH_DIR = "search"
+SEARCH_VERSION = 1
+SEARCH_WINDOW_DAYS = 30
+SEARCH_DOC_SHARD_SIZE = 256  # article records per docs shard
+SEARCH_FILE_PATTERN = re.compile(r"(?:meta|terms-[a-z0-9]|docs-\d+)\.json")
+
+
+def build_search_index(connection, since):
+    """
+    Return {file name: JSON text} for the index over articles published since
+    the given timestamp. Postings are ascending rowids, delta-encoded.
+    """
+    terms = {}
+    docs = {}
+    oldest = None
+    rows = connection.execute(
+        "SELECT rowid, title, link, source, published FROM articles "
+        "WHERE published >= ? ORDER BY rowid",
+        (int(since),),
+    )
+    for rowid, title, link, source, published in rows:
+        docs.setdefault(rowid // SEARCH_DOC_SHARD_SIZE, []).append(
+            [rowid, title, link, source, int(published)]
+        )
+        if oldest is None or published < oldest:
+            oldest = int(published)
+        for token in title_tokens(title) | title_tokens(source):
+            terms.setdefault(token, []).append(rowid)
+
+    shards = {}
+    for token, rowids in terms.items():
+        deltas = [rowids[0]] + [b - a for a, b in zip(rowids, rowids[1:])]
+        shards.setdefault(token[0], {})[token] = deltas
+
+    def dump(data):
+        return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+    files = {f"terms-{key}.json": dump(shard) for key, shard in shards.items()}
+    files.update({f"docs-{key}.json": dump(records) for key, records in docs.items()})
+    # search.js fetches shards as name?v=hash, so a browser cache never
+    # serves an old shard next to a newer meta.json.
+    files["meta.json"] = dump({
+        "version": SEARCH_VERSION,
+        "window_days": SEARCH_WINDOW_DAYS,
+        "doc_shard_size": SEARCH_DOC_SHARD_SIZE,
+        "docs": sum(len(records) for records in docs.values()),
+        "oldest": oldest,
+        "stopwords": sorted(TITLE_STOPWORDS),
+        "files": {
+            name: hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+            for name, text in files.items()
+        },
+    })
+    return files
+
+
+def search_index_is_stale(now=None, directory=SEARCH_DIR):
+    """
+    True when the index is missing or from another version, or when its
+    oldest article has aged out of the window. Runs that store no new
+    articles rebuild it only then.
+    """
+    try:
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return True
+    if not isinstance(meta, dict) or meta.get("version") != SEARCH_VERSION:
+        return True
+    oldest = meta.get("oldest")
+    if oldest is None:
+        return False
+    now = now or datetime.now(timezone.utc)
+    return oldest < (now - timedelta(days=SEARCH_WINDOW_DAYS)).timestamp()
+
+
+def search_stage(connection, now=None, directory=SEARCH_DIR):
+    """
+    Rebuild the search index and rewrite only the shards whose content
+    changed; shards no longer in the index are removed. Returns the number
+    of files written or removed.
+    """
+    now = now or datetime.now(timezone.utc)
+    since = (now - timedelta(days=SEARCH_WINDOW_DAYS)).timestamp()
+    files = build_search_index(connection, since)
+
+    os.makedirs(directory, exist_ok=True)
+    changed = 0
+    for name in os.listdir(directory):
+        if SEARCH_FILE_PATTERN.fullmatch(name) and name not in files:
+            os.remove(os.path.join(directory, name))
+            changed += 1
+
+    for name, text in files.items():
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                if file.read() == text:
+                    continue
+        except (FileNotFoundError, OSError):
+            pass
+        temporary_file = path + ".tmp"
+        with open(temporary_file, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temporary_file, path)
+        changed += 1
+
+    METRICS.count("search_files_changed", changed)
+    if changed:
+        print(f"✅ Search index updated: {len(files)} files, {changed} changed.")
+    return changed
+
+# ============================================================
+# END PIPELINE STAGE — SEARCH INDEX
+# ============================================================
+
+
+def load_upcoming_launches():
+    """Fetch upcoming launches through the cache (safe fail)."""
+    try:
+        with METRICS.stage("launches_fetch", host="ll.thespacedevs.com"):
+            return get_upcoming_launches(
+                limit=8,
+                days_ahead=7
+            )
+    except Exception as error:
+        print(f"⚠️ Upcoming launches skipped: {error}")
+        return []
+
+
+# ============================================================
+# DAEMON MODE
+# `update.py --daemon` keeps one process running instead of a new
+# one every 5 minutes. Parsed feeds, the article store, the SAM
+# opportunities, launches and the summary stay warm in memory;
+# each feed is polled on its own adaptive interval, and index.html is
+# rewritten only when the rendered block actually changes.
+# ============================================================
+
+DAEMON_LAUNCHES_INTERVAL = LAUNCHES_CACHE_MINUTES * 60
+DAEMON_SAM_INTERVAL = SAM_CACHE_HOURS * 60 * 60
+DAEMON_SUMMARY_INTERVAL = 10 * 60
+DAEMON_RENDER_INTERVAL = 15  # batch changes from jobs that finish together
+DAEMON_MAX_SLEEP = 60
+
+
+def run_daemon():
+    """Poll each source on its own schedule and keep index.html current."""
+    feed_cache = {} if fixtures_active() else load_feed_cache()
+    article_store = open_article_store()
+    state = {
+        "launches": [],
+        "sam": [],
+        "summary_html": "",
+        "summary_date": None,
+        "written_content": None,
+    }
+    fragments = load_fragment_cache()
+
+    started = monotonic()
+    next_due = {f"feed:{source}": started for source in feeds}
+    next_due.update({"launches": started, "sam": started, "summary": started})
+    dirty = True
+    last_render = 0.0
+
+    print(f"ℹ️ Daemon started with {len(next_due)} scheduled jobs.")
+    try:
+        while True:
+            now = monotonic()
+            due = [job for job, due_at in next_due.items() if due_at <= now]
+            METRICS.reset()
+            RUN_BUDGET.start()
+            cutoff = datetime.now(timezone.utc) - timedelta(hours=ARTICLE_WINDOW_HOURS)
+
+            # All due feeds are fetched together, like a normal run.
+            due_feeds = {
+                job.split(":", 1)[1]: feeds[job.split(":", 1)[1]]
+                for job in due
+                if job.startswith("feed:")
             }
-        }
-        jsonld_tag = '<script type="application/ld+json">' + json.dumps(json_ld, ensure_ascii=False) + "</script>"
-        doc = _insert_before_head_close(doc, jsonld_tag)
+            if due_feeds:
+                with METRICS.stage("fetch"):
+                    fetch_results = fetch_all_feeds(due_feeds, feed_cache)
+                with METRICS.stage("parse"):
+                    if parse_stage(fetch_results, feed_cache, article_store, cutoff):
+                        dirty = True
+                # Adaptive per-feed intervals; a failed fetch retries soonest.
+                for source, result in fetch_results:
+                    cached = feed_cache.get(feeds[source]) or {}
+                    interval = cached.get("poll_interval") if result else None
+                    next_due[f"feed:{source}"] = now + (interval or FEED_POLL_MIN)
+
+            if "launches" in due:
+                state["launches"] = load_upcoming_launches()
+                dirty = True
+                next_due["launches"] = now + DAEMON_LAUNCHES_INTERVAL
+
+            if "sam" in due:
+                with METRICS.stage("sam"):
+                    state["sam"] = get_sam_opportunities(limit=8)
+                dirty = True
+                next_due["sam"] = now + DAEMON_SAM_INTERVAL
+
+            if "summary" in due:
+                today_utc = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+                if state["summary_date"] != today_utc:
+                    latest, _, _ = rank_stage(article_store, cutoff)
+                    with METRICS.stage("summarize"):
+                        state["summary_html"] = summarize_stage(latest)
+                    if state["summary_html"] and load_summary_cache().get("date") == today_utc:
+                        state["summary_date"] = today_utc
+                    dirty = True
+                next_due["summary"] = now + DAEMON_SUMMARY_INTERVAL
+
+            rendered = dirty and now - last_render >= DAEMON_RENDER_INTERVAL
+            if rendered:
+                with METRICS.stage("rank"):
+                    _, top_story, sources = rank_stage(article_store, cutoff)
+                with METRICS.stage("render"):
+                    new_content = render_stage(
+                        state["summary_html"],
+                        top_story,
+                        sources,
+                        state["launches"],
+                        state["sam"],
+                        fragments,
+                    )
+                if new_content != state["written_content"]:
+                    with METRICS.stage("write"):
+                        write_stage(new_content)
+                        api_stage(top_story, sources, state["launches"], state["sam"])
+                    with METRICS.stage("search_index"):
+                        search_stage(article_store)
+                    state["written_content"] = new_content
+                    try:
+                        save_fragment_cache(fragments)
+                    except OSError as error:
+                        print(f"⚠️ Fragment cache not saved: {error}")
+                elif search_index_is_stale():
+                    # Articles age out of the index even when the page holds still.
+                    with METRICS.stage("search_index"):
+                        search_stage(article_store)
+                dirty = False
+                last_render = now
+
+            # METRICS is reset every loop, so each loop that did work is one line.
+            if due or rendered:
+                try:
+                    METRICS.write()
+                except OSError as error:
+                    print(f"⚠️ Run metrics not saved: {error}")
 
-    return doc
-html = ensure_seo_non_destructive(html)
-# ---------------- END SAFE HEAD + GA + SEO --------------------
+            try:
+                BREAKERS.save()
+            except OSError as error:
+                print(f"⚠️ Circuit breaker state not saved: {error}")
 
-start = html.find("<!-- START HEADLINES -->")
-end = html.find("<!-- END HEADLINES -->")
-
-if start != -1 and end != -1:
-    new_content = '<!-- START HEADLINES -->\n' + daily_summary_html + '\n' + top_html + "\n".join(sections) + '\n<!-- END HEADLINES -->'    
-    updated_html = html[:start] + new_content + html[end + len("<!-- END HEADLINES -->"):]
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write(updated_html)
-    print("✅ Headlines updated successfully.")
-else:
-    # At least persist head updates so SEO/GA are kept even if markers are missing
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write(html)
-    print("❗ Injection markers not found. Wrote head (SEO/GA) updates only.")
+            wake_at = min(next_due.values())
+            if dirty:
+                wake_at = min(wake_at, last_render + DAEMON_RENDER_INTERVAL)
+            sleep(min(DAEMON_MAX_SLEEP, max(1.0, wake_at - monotonic())))
+
+    except KeyboardInterrupt:
+        print("ℹ️ Daemon stopped.")
+    finally:
+        article_store.close()
+
+# ============================================================
+# END DAEMON MODE
+# ============================================================
+
+
+def run_once():
+    """One full update: fetch, parse, rank, summarize, render, write."""
+    METRICS.reset()
+    RUN_BUDGET.start()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=ARTICLE_WINDOW_HOURS)
+    # Every feed is fetched in full while recording or replaying.
+    feed_cache = {} if fixtures_active() else load_feed_cache()
+
+    with METRICS.stage("fetch"):
+        fetch_results = fetch_stage(feed_cache)
+
+    article_store = open_article_store()
+    try:
+        with METRICS.stage("parse"):
+            new_articles = parse_stage(fetch_results, feed_cache, article_store, cutoff)
+        with METRICS.stage("rank"):
+            latest, top_story, sources = rank_stage(article_store, cutoff)
+        if new_articles or search_index_is_stale():
+            with METRICS.stage("search_index"):
+                search_stage(article_store)
+    finally:
+        article_store.close()
+
+    with METRICS.stage("summarize"):
+        daily_summary_html = summarize_stage(latest)
+    upcoming_launches = load_upcoming_launches()
+    with METRICS.stage("sam"):
+        sam_opportunities = get_sam_opportunities(limit=8)
+
+    fragments = load_fragment_cache()
+    with METRICS.stage("render"):
+        new_content = render_stage(
+            daily_summary_html,
+            top_story,
+            sources,
+            upcoming_launches,
+            sam_opportunities,
+            fragments,
+        )
+    with METRICS.stage("write"):
+        write_stage(new_content)
+        api_stage(top_story, sources, upcoming_launches, sam_opportunities)
+    try:
+        save_fragment_cache(fragments)
+    except OSError as error:
+        print(f"⚠️ Fragment cache not saved: {error}")
+    try:
+        BREAKERS.save()
+    except OSError as error:
+        print(f"⚠️ Circuit breaker state not saved: {error}")
+
+    report = METRICS.report()
+    try:
+        METRICS.write()
+    except OSError as error:
+        print(f"⚠️ Run metrics not saved: {error}")
+    print(f"⏱️ Run finished in {report['seconds']:.2f}s.")
+
+
+def parse_args(argv=None):
+    """Command-line options for update.py."""
+    parser = argparse.ArgumentParser(description="Update SpaceHeadlines index.html.")
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument(
+        "--record", metavar="DIR",
+        help="save every external response under DIR while running live",
+    )
+    fixtures.add_argument(
+        "--replay", metavar="DIR",
+        help="answer every external call from responses recorded in DIR",
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="keep running, polling each source on its own interval",
+    )
+    parser.add_argument(
+        "--metrics-report", action="store_true",
+        help=f"print p50/p95 timings per stage and source from {RUN_METRICS_FILE} and exit",
+    )
+    parser.add_argument(
+        "--replay-latency", type=float, default=0.0, metavar="SCALE",
+        help="with --replay, sleep SCALE times each call's recorded latency",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Parse the options, then run one update or the daemon."""
+    args = parse_args(argv)
+    if args.metrics_report:
+        print_metrics_report()
+        return
+    if args.record:
+        configure_fixtures("record", args.record)
+    elif args.replay:
+        configure_fixtures("replay", args.replay, latency=args.replay_latency)
+
+    with replay_directory():
+        BREAKERS.load()
+        if args.daemon:
+            run_daemon()
+        else:
+            run_once()
+
+
+if __name__ == "__main__":
+    main()